@@ -1,35 +1,91 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots 
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from article_table import topic_share
+from cooccurrence import VOCABULARY_FILE, article_mask, comention_counts, network_figure, prune_network, top_pairs
+from count_cube import segment_bar_figure, segment_counts, year_bar_figure
+from data_store import ARTICLE_FILES, ARTICLE_SOURCES, OUTLETS, TOPICS
+from dataset_registry import REGISTRY
+from dedup import dedup_report, unique_articles
+from entity_index import COUNT_FILES, ENTITY_LABELS, get_index
+from entity_normalize import ALIASES_FILE, normalization_id
+from instrumentation import (begin_rerun, count, enabled, end_rerun, register_collector, serve_metrics, span,
+                             start_profile, stop_profile)
+from keyword_table import KEYWORDS_FILE, keyword_table
+from salience import distinctive_terms, salience_bar_figure, salience_heatmap, salience_over_time
+from sections import register_section, run_section, section, section_stats
+from timeline import GRANULARITIES, date_bounds, topic_timeline
+from warmup import start_warmup, warmup_stats
+from wordcloud_cache import cache_stats, wordcloud_png
+
+
+# === INSTRUMENTATION ===
+
+# Spans are only recorded while the debug panel is open (or MEDIA_INSTRUMENTATION / MEDIA_METRICS_LOG is set)
+begin_rerun(st.session_state.get("debug_panel", False))
+# The "Profile this rerun" button is already pressed when the rerun it triggered starts
+profiler = start_profile() if st.session_state.get("debug_profile", False) else None
+
+register_collector("sections", section_stats)
+register_collector("wordcloud_cache", cache_stats)
+register_collector("datasets", lambda: dict(REGISTRY.stats, memory_bytes=REGISTRY.memory_bytes()))
+serve_metrics()
+register_collector("warmup", warmup_stats)
 
 
 # === UTILITIES ===
 
-@st.cache
-def load_data(path: str) -> pd.DataFrame:
-    return pd.read_csv(path)
-
-# Function to generate and display word cloud
-def generate_wordcloud(data_counts):
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(data_counts)
-    
-    # Create a figure and axis object explicitly
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
-    ax.axis('off')
-    
-    st.pyplot(fig)  # Pass the specific figure object to st.pyplot
+# Function to render the word cloud of the top N normalized entities in a count file.
+# The ranking is only consulted on a render cache miss
+def wordcloud_image(source, entity_type, top_n, min_count=1):
+    data_counts = lambda: get_index(source, min_count).top_n(ENTITY_LABELS[entity_type], top_n)
+    return wordcloud_png(source, entity_type, top_n, data_counts, variant=normalization_id(), min_count=min_count)
+
+# Function to generate and display word cloud as its own section, recomputed only when
+# its entity type and top N widgets or the count file change
+def generate_wordcloud(source, entity_key, top_n_key, min_count=1):
+    name = f"Word Cloud: {source}"
+    register_section(name, lambda entity_type, top_n: wordcloud_image(source, entity_type, top_n, min_count),
+                     inputs=[entity_key, top_n_key], sources=[source, ALIASES_FILE])
+    png = run_section(name, st.session_state)
+    with span(f"render {name}"):
+        st.image(png)
+    count("payload.image_bytes", len(png))
+
+
+# Function to display a Plotly figure, timing the render and its JSON payload size
+def show_chart(figure, name):
+    with span(f"render {name}"):
+        st.plotly_chart(figure)
+    if enabled():
+        count("payload.chart_bytes", len(figure.to_json()))
+
+
+# Function to describe how much entity normalization shrank a count file's vocabulary
+def normalization_note(source):
+    report = get_index(source).report
+    return (f"Before ranking, names are casefolded and stripped of punctuation, spelling variants listed in entity_aliases.csv are merged, "
+            f"and number, currency, phone and date tokens are removed: {report['noise_removed']} noise tokens and "
+            f"{report['variants_merged']} variants were dropped, shrinking the vocabulary by {report['shrink_percent']}%.")
 
 # === SIDEBAR CONFIGURATION ===
 st.sidebar.header("Dashboard Configuration")
 st.sidebar.markdown("Use the options below to customize the visualizations.")
 # Add more sidebar configurations if needed
 
+# Raw counts include the same story scraped twice (reposts, tracking links, syndicated copies); deduplicated
+# counts keep one article per cluster of exact and near duplicates
+article_counts = st.sidebar.radio("Article Counts", ("Raw", "Deduplicated"), key="article_counts",
+                                  help="Deduplicated counts drop repeated links, identical bodies and near-identical rewrites within a topic")
+deduplicated = article_counts == "Deduplicated"
+
+# Date and year ranges offered by the pickers, from the publication dates parsed into the snapshots
+first_day, last_day = date_bounds()
+first_year, last_year = first_day.year, last_day.year
+
 # === COMPONENT 1 ===
 
 ## 1.a General distribution of articles
@@ -41,437 +97,404 @@ st.markdown("""
 In this section, you are presented with a summary of articles obtained from all keywords and categorized into PLTS-related and PLTB-related articles. These keywords have been identified by David and me. From the graph below, we can observe that using broader keywords generates a higher number of articles. You can use the legend next to the graph to filter the data and hover over specific points on the graph to access precise information.
 """)
 
-media_data = load_data("Media_PLTSB - Sheet1.csv")
-
 # Sidebar for Component 1.a
 st.sidebar.subheader("Media Distribution")
 viz_type_media = st.sidebar.radio(
     "Select Visualization Type for **Keywords**",
-    ("Line Graph", "Bar Chart", "Raw Data")
+    ("Line Graph", "Bar Chart", "Raw Data"),
+    key="viz_type_media"
 )
 
-# Display based on selection
-if viz_type_media == "Bar Chart":
-    # Calculate the total counts for each media
-    total_counts = {
-        'Detik': media_data['Detik'].sum(),
-        'CNBC': media_data['CNBC'].sum(),
-        'Tribun': media_data['Tribun'].sum()
-    }
-
-    # Create a bar chart
-    total_articles = go.Figure(data=[go.Bar(
-        x=list(total_counts.keys()),
-        y=list(total_counts.values())
-    )])
+# Component 1.a, counted from the article text (see keyword_table.py) and recomputed only when the
+# visualization type, the keyword list or an article file changes
+@section("Media Distribution", inputs=["viz_type_media"], sources=[KEYWORDS_FILE] + ARTICLE_FILES)
+def media_distribution(viz_type_media):
+    # Plotly is imported on first use, so the page starts rendering before it is loaded
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
 
-    # Add titles and labels
-    total_articles.update_layout(title_text='Total Articles Produced Per Media', xaxis_title='Media', yaxis_title='Article')
+    media_data = keyword_table()
 
-    # Display the plot using plotly_chart
-    st.plotly_chart(total_articles)
-    st.markdown("**Notes:** This bar chart shows the total number of articles produced by each media outlet. Comparing these numbers can provide insights into the volume of coverage given by each media source.")
+    if viz_type_media == "Bar Chart":
+        # Calculate the total counts for each media
+        total_counts = {media: media_data[media].sum() for media in OUTLETS}
 
-elif viz_type_media == "Raw Data":
-    # Display Raw Data
-    st.write(media_data)
-    st.markdown("**Notes:** The raw data provides a comprehensive view of media coverage data across different media outlets. Exploring this data can help in identifying specific trends and patterns in media coverage.")
+        # Create a bar chart
+        total_articles = go.Figure(data=[go.Bar(
+            x=list(total_counts.keys()),
+            y=list(total_counts.values())
+        )])
+
+        # Add titles and labels
+        total_articles.update_layout(title_text='Total Articles Produced Per Media', xaxis_title='Media', yaxis_title='Article')
+        return total_articles
+
+    if viz_type_media == "Raw Data":
+        return media_data
 
-else:  # Default to Line Graph
     # Create a subplot for line graph
     keyword_media = make_subplots(specs=[[{"secondary_y": True}]])
 
     # Add traces
-    keyword_media.add_trace(go.Scatter(x=media_data['Keyword'], y=media_data['Detik'], mode='lines+markers', name='Detik'), secondary_y=True)
-    keyword_media.add_trace(go.Scatter(x=media_data['Keyword'], y=media_data['CNBC'], mode='lines+markers', name='CNBC'), secondary_y=True)
-    keyword_media.add_trace(go.Scatter(x=media_data['Keyword'], y=media_data['Tribun'], mode='lines+markers', name='Tribun'), secondary_y=True)
+    for media in OUTLETS:
+        keyword_media.add_trace(go.Scatter(x=media_data['Keyword'], y=media_data[media], mode='lines+markers', name=media), secondary_y=True)
 
     # Add titles and labels
     keyword_media.update_layout(title_text='Keyword Across Media', xaxis_title='Keyword', yaxis_title='Counts')
+    return keyword_media
 
+media_output = run_section("Media Distribution", st.session_state)
+
+# Display based on selection
+if viz_type_media == "Bar Chart":
     # Display the plot using plotly_chart
-    st.plotly_chart(keyword_media)
+    show_chart(media_output, "Media Distribution")
+    st.markdown("**Notes:** This bar chart shows the total number of articles produced by each media outlet. Comparing these numbers can provide insights into the volume of coverage given by each media source.")
+
+elif viz_type_media == "Raw Data":
+    # Display Raw Data
+    with span("render Media Distribution"):
+        st.write(media_output)
+    st.markdown("**Notes:** The raw data provides a comprehensive view of media coverage data across different media outlets. Exploring this data can help in identifying specific trends and patterns in media coverage.")
+
+else:  # Default to Line Graph
+    # Display the plot using plotly_chart
+    show_chart(media_output, "Media Distribution")
     st.markdown("**Notes:** The line graph visualizes the distribution of articles across different media outlets based on specific keywords. The trends in media coverage can provide insights into the popularity and emphasis of certain topics in the media.")
 
 ## 1.b Key actors identified from the whole corpus
 
 # Key Actors Analysis
-key_actors_data = load_data("corpus_cleaned.csv")  # Load the new source data
-
 st.subheader("Key Actors Analysis")
 st.markdown("In the following visualizations, you will observe various actors and institutions identified within the entire dataset. This dataset was collected using the aforementioned keywords from three news outlets: Detik.com, Cnbcindonesia.com, and Tribunnews.com. To discern key actors mentioned in these media sources, I employed Named Entity Recognition (NER) using a pre-defined model known as cahya/bert-base-indonesian-NER. While you may encounter some false positives in the word cloud, it is due to my time limitations, which prevented me from comparing different models or fine-tuning the model with the corpus. It is highly recommended that future research teams allocate more time to train and evaluate the model on a specific corpus")
 
 # Sidebar for Word Cloud
 st.sidebar.subheader("PLTS: Word Cloud - Overall Corpus")
 entity_type = st.sidebar.selectbox("Choose Entity Type", ['Individuals', 'Organizations'], key="PLTS Word Cloud")
-top_n = st.sidebar.slider('Choose top N entities for word cloud', 10, 100, 50)
+top_n = st.sidebar.slider('Choose top N entities for word cloud', 10, 100, 50, key="plts_top_n")
 
 # Add a checkbox to the sidebar for showing raw data
 show_raw_data = st.sidebar.checkbox("Show Raw Data", False)
 
-# Filter relevant entities based on entity type
-filtered_key_actors_data = key_actors_data[key_actors_data['NER_Label'] == 'B-PER'] if entity_type == 'Individuals' else key_actors_data[key_actors_data['NER_Label'] == 'B-ORG']
-
-# Group by entities and sum the counts
-key_actors_counts = filtered_key_actors_data.groupby('Entity')['Counts'].sum().reset_index()
-
-# Filter entities with counts >= 2
-key_actors_counts = key_actors_counts[key_actors_counts['Counts'] >= 2]
-
-# Sort entities by counts in descending order
-key_actors_counts = key_actors_counts.sort_values(by='Counts', ascending=False)
-
-# Generate and display the word cloud
+# Generate and display the word cloud of entities with counts >= 2
 st.subheader(f"PLTS: Top {top_n} {entity_type}")
-entity_counts = dict(zip(key_actors_counts['Entity'], key_actors_counts['Counts']))
-generate_wordcloud({entity: entity_counts[entity] for entity in list(entity_counts)[:top_n]})
+generate_wordcloud("corpus_cleaned.csv", "PLTS Word Cloud", "plts_top_n", min_count=2)
 
 # # Display the key actors table when the button is checked
 # st.subheader(f"Top {entity_type} in the Corpus")
 # if show_raw_data:
-#     st.dataframe(key_actors_counts)
+#     st.dataframe(get_index("corpus_cleaned.csv", 2).prefix(ENTITY_LABELS[entity_type], "", limit=None))
 
-st.markdown("**Note:** You might observe that I haven't combined similar names into a single entity, as even a slight difference in spelling might lead to distinct identifications. You can hover over the sidebar to choose the number of entities you wish to display, ranging from 10 to 100. You can also change the category of actors, either **Individual** or **Organization**")
+st.markdown("**Note:** You might observe that some similar names are still separate entities, as even a slight difference in spelling might lead to distinct identifications. " + normalization_note("corpus_cleaned.csv") + " You can hover over the sidebar to choose the number of entities you wish to display, ranging from 10 to 100. You can also change the category of actors, either **Individual** or **Organization**")
 
 
 # Placeholder for 1.b visualizations
 
-# Load the new data source for PLTB word cloud
-pltb_wordcloud_data = load_data("pltb_wordcloud.csv")
-
 # Sidebar for PLTB Word Cloud
 st.sidebar.subheader("PLTB: Word Cloud - Overall Corpus")
 entity_type_pltb = st.sidebar.selectbox("Choose Entity Type (PLTB)", ['Individuals', 'Organizations'], key="pltb_entity_type")
 top_n_pltb = st.sidebar.slider('Choose top N entities for word cloud (PLTB)', 10, 100, 50, key="pltb_top_n")
 
-# Filter relevant entities based on entity type for PLTB
-filtered_pltb_wordcloud_data = pltb_wordcloud_data[pltb_wordcloud_data['NER_Label'] == 'B-PER'] if entity_type_pltb == 'Individuals' else pltb_wordcloud_data[pltb_wordcloud_data['NER_Label'] == 'B-ORG']
-
-# Group by entities and sum the counts for PLTB
-pltb_counts = filtered_pltb_wordcloud_data.groupby('Entity')['Counts'].sum().reset_index()
-
-# Filter entities with counts >= 2 for PLTB
-pltb_counts = pltb_counts[pltb_counts['Counts'] >= 2]
-
-# Sort entities by counts in descending order for PLTB
-pltb_counts = pltb_counts.sort_values(by='Counts', ascending=False)
-
-# Generate and display the word cloud for PLTB
+# Generate and display the word cloud for PLTB entities with counts >= 2
 st.subheader(f"PLTB: Word Cloud for Top {top_n_pltb} {entity_type_pltb}")
-pltb_entity_counts = dict(zip(pltb_counts['Entity'], pltb_counts['Counts']))
-generate_wordcloud({entity: pltb_entity_counts[entity] for entity in list(pltb_entity_counts)[:top_n_pltb]})
-
-st.markdown("**Note:** You might observe that I haven't combined similar names into a single entity, as even a slight difference in spelling might lead to distinct identifications. You can hover over the sidebar to choose the number of entities you wish to display, ranging from 10 to 100. You can also change the category of actors, either **Individual** or **Organization**")
-
-
-# === COMPONENT 2 ===
-
-
-
-
-# Dashboard Title
-st.title("PLTS Cirata: Media Coverage Analysis")
-
-# Sidebar Title
-st.sidebar.title("PLTS Analysis Sidebar")
-
-# Context for the PLTS Coverage
-st.subheader("PLTS Coverage")
-st.markdown("In this segment, we will delve into how frequently major Indonesian newspapers cover the topic of PLTS, the segments under which they fall, the key actors frequently referred to, and the primary discussions related to PLTS Cirata. The sequence of media coverage will be as follows: Detik, CNBC, and Tribun. The name of the media source will be prominently displayed on top of the visualizations, along with its content. In some instances, the analysis is still ongoing (such as key ideas), as I require more time to produce a refined result and extrapolate the outcome to the entire dataset.")
-
-@st.cache
-def load_data(filepath):
-    return pd.read_csv(filepath)
-
-aggregated_counts = load_data("aggregated_counts.csv")
-people_counts = aggregated_counts[aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-org_counts = aggregated_counts[aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-cnbc_aggregated_counts = load_data("aggregated_counts_cnbcplts.csv")
-cnbc_people_counts = cnbc_aggregated_counts[cnbc_aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-cnbc_org_counts = cnbc_aggregated_counts[cnbc_aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-tribun_aggregated_counts = load_data("aggregated_counts_tribunplts.csv")
-tribun_people_counts = tribun_aggregated_counts[tribun_aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-tribun_org_counts = tribun_aggregated_counts[tribun_aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-
-# Function to generate and display word cloud
-def generate_wordcloud(data_counts):
-    wordcloud = WordCloud(width=800, height=400, background_color ='white').generate_from_frequencies(data_counts)
-    
-    # Create a figure and axis object explicitly
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
-    ax.axis('off')
-    
-    st.pyplot(fig)  # Pass the specific figure object to st.pyplot
-
-
-# Sidebar Feature for Detik Analysis
-st.sidebar.subheader("Detik Analysis - Date Range")
-detik_start_year = st.sidebar.slider("Start Year - Detik", min_value=2000, max_value=2023, value=2000)
-detik_end_year = st.sidebar.slider("End Year - Detik", min_value=2000, max_value=2023, value=2023)
-
-# Detik Analysis
-detik_plts_copy = load_data("detik_plts_cleaned.csv")
-detik_plts_copy = detik_plts_copy[(detik_plts_copy['Year'] >= detik_start_year) & (detik_plts_copy['Year'] <= detik_end_year)]
-
-st.subheader("Detik Analysis: Number of PLTS Articles")
-st.markdown("Here, you can see the distribution of PLTS coverage (both related to PLTS Cirata and not—refer to the keywords provided at the top of the page) across the years.")
-# Histogram for Detik Number of PLTS Articles
-detik_plts_dis = px.histogram(detik_plts_copy, x='Year', nbins=int(detik_end_year - detik_start_year + 1))
-detik_plts_dis.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of PLTS Articles")
-st.plotly_chart(detik_plts_dis)
-st.markdown("**Note**: Detik began discussing solar PV even before 2010, although the coverage was minimal. The attention to this issue increased in 2015 and continued to rise before a decrease in 2019. However, a significant surge was observed in 2020, and the trend has continued to grow until 2022. Data for 2023 is incomplete as I have collected articles only up to August 2023.")
-
-st.subheader("Detik Analysis: Articles by Segment")
-
-# Histogram for Detik by Segment
-detik_plts_seg = px.histogram(detik_plts_copy, x='Year', color='Segment', nbins=int(detik_end_year - detik_start_year + 1))
-detik_plts_seg.update_layout(bargap=0.1)
-st.plotly_chart(detik_plts_seg)
-st.markdown("**Note:** Segments might be associated with the departments or focuses of the media outlets. In this case, coverage related to PLTS on Detik.com is predominantly reported by the 'Finance' department, as detikFinance comprises a significant proportion of the overall coverage.")
-
-# Sidebar for Word Cloud
-st.sidebar.subheader("Detik PLTS: Word Cloud")
-entity_type = st.sidebar.selectbox("Choose Entity Type", ['Individuals', 'Organizations'], key='detik_entity_type')
-top_n = st.sidebar.slider('Choose top N entities for word cloud', 10, 100, 50, key='slider1')
-
-# Word Cloud Visualization
-if entity_type == 'Individuals':
-    freq_data = people_counts
-else:
-    freq_data = org_counts
-
-sorted_freq_data = dict(sorted(freq_data.items(), key=lambda item: item[1], reverse=True)[:top_n])
-st.subheader(f"Detik PLTS - Word Cloud: Top {top_n} {entity_type}")
-generate_wordcloud(sorted_freq_data)
-st.markdown("Here, stakeholders exclusively identified from the Detik corpus on PLTS are presented. You can choose the number of individuals you wish to observe, ranging from 10 to 100. Hover over the sidebar for customization options")
-
-# Sidebar Feature for CNBC Analysis
-st.sidebar.subheader("CNBC Analysis - Date Range")
-cnbc_start_year = st.sidebar.slider("Start Year - CNBC", min_value=2000, max_value=2023, value=2000)
-cnbc_end_year = st.sidebar.slider("End Year - CNBC", min_value=2000, max_value=2023, value=2023)
-
-# CNBC Analysis
-cnbc_plts_merged = load_data("cnbc_plts_merged.csv")
-cnbc_plts_merged = cnbc_plts_merged[(cnbc_plts_merged['Year'] >= cnbc_start_year) & (cnbc_plts_merged['Year'] <= cnbc_end_year)]
-
-st.subheader("CNBC Analysis: Number of PLTS Articles")
-st.markdown("In the following graph, you can see the number of articles published over the years starting from 2018 to 2023. The media, CNBC Indonesia, itself was launched in 2018. From the onset, they already provided the audience with PLTS-related articles.")
-# Histogram for CNBC Number of PLTS Articles
-cnbc_plts_dis = px.histogram(cnbc_plts_merged, x='Year', nbins=int(cnbc_end_year - cnbc_start_year + 1))
-cnbc_plts_dis.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
-st.plotly_chart(cnbc_plts_dis)
-st.markdown("**Note**: the number of articles increased in 2019 but then jumped in 2021 and continue to 2022. This trend is also similar to Detik, where 2021-202 articles increased significantly.")
-
-st.subheader("CNBC Analysis: Articles by Segment")
-st.markdown("Similar to detik.com, CNBC Indonesia has several segments, ranging from Market, News, Tech, Research, Entrepreneur, Lifestyle and Opinion (Opini).")
-# Histogram for CNBC by Segment
-cnbc_plts_seg = px.histogram(cnbc_plts_merged, x='Year', color='Segment', nbins=int(cnbc_end_year - cnbc_start_year + 1))
-cnbc_plts_seg.update_layout(bargap=0.1)
-st.plotly_chart(cnbc_plts_seg)
-st.markdown("**Notes:** As you can see, the News Segment reported the most and Market Segment has also contributed to the overall news production.")
-
-# Sidebar for Word Cloud for CNBC
-st.sidebar.subheader("CNBC PLTS: Word Cloud")
-cnbc_entity_type = st.sidebar.selectbox("Choose Entity Type for CNBC", ['Individuals', 'Organizations'], key='CNBC PLTS WC')  # key is changed to avoid conflicts
-cnbc_top_n = st.sidebar.slider('Choose top N entities for CNBC word cloud', 10, 100, 50, key='slider2')  # key is changed to avoid conflicts
-
-# Word Cloud Visualization for CNBC
-if cnbc_entity_type == 'Individuals':
-    cnbc_freq_data = cnbc_people_counts
-else:
-    cnbc_freq_data = cnbc_org_counts
-
-sorted_cnbc_freq_data = dict(sorted(cnbc_freq_data.items(), key=lambda item: item[1], reverse=True)[:cnbc_top_n])
-st.subheader(f"CNBC PLTS - Word Cloud: Top {cnbc_top_n} {cnbc_entity_type}")
-generate_wordcloud(sorted_cnbc_freq_data)
-st.markdown("Here, stakeholders exclusively identified from the CNBC corpus on PLTS are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.")
-
-
-# Sidebar Feature for Tribun Analysis
-st.sidebar.subheader("Tribun Analysis - Date Range")
-tribun_start_year = st.sidebar.slider("Start Year - Tribun", min_value=2000, max_value=2023, value=2000)
-tribun_end_year = st.sidebar.slider("End Year - Tribun", min_value=2000, max_value=2023, value=2023)
-
-# Tribun Analysis
-tribun_plts_merged = load_data("tribun_plts_merged.csv")
-tribun_plts_merged = tribun_plts_merged[(tribun_plts_merged['Year'] >= tribun_start_year) & (tribun_plts_merged['Year'] <= tribun_end_year)]
-
-st.subheader("Tribun Analysis: Number of PLTS Articles")
-st.markdown("In the following graph, you can observe the number of articles published by Tribunnews.com. However, please note that the scrapping process for this media outlet is different to two others. I used keywords-related page to retrieve the articles, limiting the comprehensiveness of the data collection due to technical issues. This means that, the actual number of news produced might be larger that the articles collected by me.")
-# Histogram for Tribun
-tribun_plts = px.histogram(tribun_plts_merged, x='Year', nbins=int(tribun_end_year - tribun_start_year + 1))
-tribun_plts.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
-st.plotly_chart(tribun_plts)
-st.markdown("**Notes:** Although 2017 is the year with the most articles published using the keywords, the year 2021 and 2022 are also significant. The trend is also shared by Detik and CNBC Indonesia.)")
-
-# Sidebar for Word Cloud for Tribun
-st.sidebar.subheader("Tribun PLTS: Word Cloud")
-tribun_entity_type = st.sidebar.selectbox("Choose Entity Type for Tribun", ['Individuals', 'Organizations'], key='Tribun PLTS WC')  # key is changed to avoid conflicts
-tribun_top_n = st.sidebar.slider('Choose top N entities for Tribun word cloud', 10, 100, 50, key='slider3')  # key is changed to avoid conflicts
-
-# Word Cloud Visualization for Tribun
-if tribun_entity_type == 'Individuals':
-    tribun_freq_data = tribun_people_counts
-else:
-    tribun_freq_data = tribun_org_counts
-
-sorted_tribun_freq_data = dict(sorted(tribun_freq_data.items(), key=lambda item: item[1], reverse=True)[:tribun_top_n])
-st.subheader(f"Tribun PLTS - Word Cloud: Top {tribun_top_n} {tribun_entity_type}")
-generate_wordcloud(sorted_tribun_freq_data)
-st.markdown("Here, stakeholders identified from the Tribun corpus on PLTS are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.")
-
-
-# === COMPONENT 3 ===
-
-
-
-# Dashboard Title
-st.title("PLTB Project Analysis")
-
-# Sidebar Title
-st.sidebar.title("PLTB Analysis Sidebar")
-
-# Context for the PLTB Coverage
-st.subheader("PLTB Coverage")
-st.markdown("In this section, you will encounter a similar structure as above with the focus on PLTB reporting. The content includes the number of articles produced, the segment with most publication on the topic, the key actors that are frequently mentioned by the media, and the key ideas surrounding these articles.")
-
-@st.cache
-def load_data(filepath):
-    return pd.read_csv(filepath)
-
-detik_pltb_aggregated_counts = load_data("aggregated_counts_detikangin.csv")
-detik_pltb_people_counts = detik_pltb_aggregated_counts[detik_pltb_aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-detik_pltb_org_counts = detik_pltb_aggregated_counts[detik_pltb_aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-cnbc_pltb_aggregated_counts = load_data("aggregated_counts_cnbcangin.csv")
-cnbc_pltb_people_counts = cnbc_pltb_aggregated_counts[cnbc_pltb_aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-cnbc_pltb_org_counts = cnbc_pltb_aggregated_counts[cnbc_pltb_aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-tribun_pltb_aggregated_counts = load_data("aggregated_counts_tribunpltb.csv")
-tribun_pltb_people_counts = tribun_pltb_aggregated_counts[tribun_pltb_aggregated_counts['NER_Label'] == 'B-PER'].set_index("Entity")["Counts"].to_dict()
-tribun_pltb_org_counts = tribun_pltb_aggregated_counts[tribun_pltb_aggregated_counts['NER_Label'] == 'B-ORG'].set_index("Entity")["Counts"].to_dict()
-
-# Sidebar Feature for Detik Analysis
-st.sidebar.subheader("Detik PLTB Analysis - Date Range")
-detik_pltb_start_year = st.sidebar.slider("Start Year - Detik", min_value=2000, max_value=2023, value=2000, key="detik_pltb_start_year")
-detik_pltb_end_year = st.sidebar.slider("End Year - Detik", min_value=2000, max_value=2023, value=2023, key="detik_pltb_end_year")
-
-# Detik PLTB Analysis
-detik_pltb_copy = load_data("detik_pltb_cleaned.csv")
-detik_pltb_copy = detik_pltb_copy[(detik_pltb_copy['Year'] >= detik_pltb_start_year) & (detik_pltb_copy['Year'] <= detik_pltb_end_year)]
-
-st.subheader("Detik PLTB Analysis: Number of Articles")
-st.markdown("n the following visualization, you will see the number of articles produced by Detik.com under PLTB-related keywords. ")
-# Histogram for Detik Number of Articles
-detik_pltb_dis = px.histogram(detik_pltb_copy, x='Year', nbins=int(detik_pltb_end_year - detik_pltb_start_year + 1))
-detik_pltb_dis.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
-st.plotly_chart(detik_pltb_dis)
-st.markdown("**Note**: From the graph we learned that the year 2017 and 2018 are the period with the most publication. This might be predicted as PLTB sidrap is launched in this timeframe.")
-
-st.subheader("Detik PLTB Analysis: Articles by Segment")
-st.markdown("Here, you can observe different segments that report on the PLTB on detik.com. From the graph, it’s clear that majority of the news articles are produced by detikFinance and small proportion is contributed by detikNews")
-# Histogram for Detik by Segment
-detik_pltb_seg = px.histogram(detik_pltb_copy, x='Year', color='Segment', nbins=int(detik_pltb_end_year - detik_pltb_start_year + 1))
-detik_pltb_seg.update_layout(bargap=0.1)
-st.plotly_chart(detik_pltb_seg)
-
-# Sidebar for Word Cloud for Detik
-st.sidebar.subheader("Detik PLTB: Word Cloud")
-detik_entity_type = st.sidebar.selectbox("Choose Entity Type for Detik", ['Individuals', 'Organizations'], key='Detik PLTB WC')
-detik_top_n = st.sidebar.slider('Choose top N entities for Detik word cloud', 10, 100, 50, key='slider Detik PLTB WC')
-
-# Word Cloud Visualization for Detik
-if detik_entity_type == 'Individuals':
-    detik_freq_data = detik_pltb_people_counts
-else:
-    detik_freq_data = detik_pltb_org_counts
-
-sorted_detik_freq_data = dict(sorted(detik_freq_data.items(), key=lambda item: item[1], reverse=True)[:detik_top_n])
-st.subheader(f"Detik PLTB - Word Cloud: Top {detik_top_n} {detik_entity_type}")
-generate_wordcloud(sorted_detik_freq_data)
-st.markdown("Key stakeholders identified from Detik's PLTB articles are displayed in this word cloud. Customize the visualization using the sidebar options.")
-
-
-# Sidebar Feature for CNBC Analysis
-st.sidebar.subheader("CNBC PLTB Analysis - Date Range")
-cnbc_pltb_start_year = st.sidebar.slider("Start Year - CNBC", min_value=2000, max_value=2023, value=2000, key="cnbc_pltb_start_year")
-cnbc_pltb_end_year = st.sidebar.slider("End Year - CNBC", min_value=2000, max_value=2023, value=2023, key="cnbc_pltb_end_year")
-
-# CNBC PLTB Analysis
-cnbc_pltb_merged = load_data("cnbc_pltb_merged.csv")
-cnbc_pltb_merged = cnbc_pltb_merged[(cnbc_pltb_merged['Year'] >= cnbc_pltb_start_year) & (cnbc_pltb_merged['Year'] <= cnbc_pltb_end_year)]
-
-st.subheader("CNBC PLTB Analysis: Number of Articles")
-st.markdown("From the onset, CNBC had consistently repored on the wind energy from 2018. Compare to Solar PV, the articles covering wind energy from this media was much more during this year.")
-
-# Histogram for CNBC Number of Articles
-cnbc_pltb_dis = px.histogram(cnbc_pltb_merged, x='Year', nbins=int(cnbc_pltb_end_year - cnbc_pltb_start_year + 1))
-cnbc_pltb_dis.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
-st.plotly_chart(cnbc_pltb_dis)
-st.markdown("**Note**: From 2018 to 2023, it seems that CNBC produced the most articles in 2022 with more than 450 articles.")
-
-st.subheader("CNBC PLTB Analysis: Articles by Segment")
-st.markdown("In the following visualization, you will find various segments within CNBC's departments that report on wind energy. These segments encompass Market, News, Lifestyle, Entrepreneur, Tech, Research, Opini, Cuap Cuap Cuan, and My Money.")
-
-# Histogram for CNBC by Segment
-cnbc_pltb_seg = px.histogram(cnbc_pltb_merged, x='Year', color='Segment', nbins=int(cnbc_pltb_end_year - cnbc_pltb_start_year + 1))
-cnbc_pltb_seg.update_layout(bargap=0.1)
-st.plotly_chart(cnbc_pltb_seg)
-st.markdown("**Note**: The graph reveals that News and Market are the two significant segments reporting on this issue. However, the majority of articles are primarily produced by the News Segment.")
-
-# Sidebar for Word Cloud for CNBC
-st.sidebar.subheader("CNBC PLTB: Word Cloud")
-cnbc_entity_type = st.sidebar.selectbox("Choose Entity Type for CNBC", ['Individuals', 'Organizations'], key='CNBC PLTB WC')
-cnbc_top_n = st.sidebar.slider('Choose top N entities for CNBC word cloud', 10, 100, 50, key='slider CNBC PLTB WC')
-
-# Word Cloud Visualization for CNBC
-if cnbc_entity_type == 'Individuals':
-    cnbc_freq_data = cnbc_pltb_people_counts
-else:
-    cnbc_freq_data = cnbc_pltb_org_counts
-
-sorted_cnbc_freq_data = dict(sorted(cnbc_freq_data.items(), key=lambda item: item[1], reverse=True)[:cnbc_top_n])
-st.subheader(f"CNBC PLTB - Word Cloud: Top {cnbc_top_n} {cnbc_entity_type}")
-generate_wordcloud(sorted_cnbc_freq_data)
-st.markdown("This word cloud represents key stakeholders mentioned in CNBC's PLTB-related content. Adjust the visualization settings from the sidebar.")
-
-
-# Sidebar Feature for Tribun Analysis
-st.sidebar.subheader("Tribun PLTB Analysis - Date Range")
-tribun_pltb_start_year = st.sidebar.slider("Start Year - Tribun", min_value=2000, max_value=2023, value=2000, key="tribun_pltb_start_year")
-tribun_pltb_end_year = st.sidebar.slider("End Year - Tribun", min_value=2000, max_value=2023, value=2023, key="tribun_pltb_end_year")
-
-# Tribun PLTB Analysis
-tribun_pltb_merged = load_data("tribun_pltb_merged.csv")
-tribun_pltb_merged = tribun_pltb_merged[(tribun_pltb_merged['Year'] >= tribun_pltb_start_year) & (tribun_pltb_merged['Year'] <= tribun_pltb_end_year)]
-
-st.subheader("Tribun PLTB Analysis: Number of Articles")
-st.markdown("Here, you can observe the number of articles related to wind energy reporting from Tribun. It's important to consider that Tribun likely has different reporting segments for this issue. Unfortunately, I wasn't able to retrieve specific segment data.")
-# Histogram for Tribun
-tribun_pltb = px.histogram(tribun_pltb_merged, x='Year', nbins=int(tribun_pltb_end_year - tribun_pltb_start_year + 1))
-tribun_pltb.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
-st.plotly_chart(tribun_pltb)
-st.markdown("**Note**: As evident, the year 2018 yielded the highest number of articles on wind energy. This could be attributed to the launch of PLTB Sidrap coinciding with that year.")
-
-# Sidebar for Word Cloud for Tribun
-st.sidebar.subheader("Tribun PLTB: Word Cloud")
-tribun_entity_type = st.sidebar.selectbox("Choose Entity Type for Tribun", ['Individuals', 'Organizations'], key='Tribun PLTB WC')
-tribun_top_n = st.sidebar.slider('Choose top N entities for Tribun word cloud', 10, 100, 50, key='slider Tribun PLTB WC')
-
-# Word Cloud Visualization for Tribun
-if tribun_entity_type == 'Individuals':
-    tribun_freq_data = tribun_pltb_people_counts
-else:
-    tribun_freq_data = tribun_pltb_org_counts
-
-sorted_tribun_freq_data = dict(sorted(tribun_freq_data.items(), key=lambda item: item[1], reverse=True)[:tribun_top_n])
-st.subheader(f"Tribun PLTB - Word Cloud: Top {tribun_top_n} {tribun_entity_type}")
-generate_wordcloud(sorted_tribun_freq_data)
-st.markdown("Here, stakeholders identified from the Tribun corpus on PLTB are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.")
+generate_wordcloud("pltb_wordcloud.csv", "pltb_entity_type", "pltb_top_n", min_count=2)
+
+st.markdown("**Note:** You might observe that some similar names are still separate entities, as even a slight difference in spelling might lead to distinct identifications. " + normalization_note("pltb_wordcloud.csv") + " You can hover over the sidebar to choose the number of entities you wish to display, ranging from 10 to 100. You can also change the category of actors, either **Individual** or **Organization**")
+
+# Sidebar for Actor Rank Lookup
+st.sidebar.subheader("Actor Rank Lookup")
+lookup_corpus = st.sidebar.selectbox("Choose Corpus", list(COUNT_FILES), key="actor_lookup_corpus")
+lookup_entity_type = st.sidebar.selectbox("Choose Entity Type (Lookup)", ['Individuals', 'Organizations'], index=1, key="actor_lookup_entity_type")
+lookup_prefix = st.sidebar.text_input("Actor name starts with", "", key="actor_lookup_prefix")
+
+# Rank of every actor matching the typed prefix, e.g. where PLN ranks in CNBC PLTB
+if lookup_prefix:
+    lookup_index = get_index(COUNT_FILES[lookup_corpus])
+    lookup_label = ENTITY_LABELS[lookup_entity_type]
+    st.subheader(f"{lookup_corpus}: {lookup_entity_type} starting with '{lookup_prefix}'")
+    with span("actor lookup"):
+        st.dataframe(lookup_index.prefix(lookup_label, lookup_prefix))
+    st.markdown(f"Ranks are out of {lookup_index.size(lookup_label)} {lookup_entity_type.lower()} identified in the {lookup_corpus} corpus.")
+
+
+## 1.d Actor co-occurrence network
+
+st.subheader("Who Is Mentioned Together")
+st.markdown("Here, two actors are linked when the same articles mention both of them; thicker lines mean more shared articles and larger dots mean more articles overall. Use the sidebar to choose the outlets, topics and years. Actors are the people and organizations the entity recognizer found, counted only where they are written with a capital letter; titles, places such as \"Kabupaten\", units and dates are left out. To keep the graph readable, only the most mentioned actors are drawn, each with its strongest links, and names found in more than a quarter of the chosen articles are left out.")
+
+# Sidebar for Component 1.d
+st.sidebar.subheader("Actor Network")
+st.sidebar.multiselect("Outlets", list(OUTLETS), default=list(OUTLETS), key="network_media")
+st.sidebar.multiselect("Topics", TOPICS, default=TOPICS, key="network_topics")
+st.sidebar.multiselect("Entity Types (Network)", ['Individuals', 'Organizations'], default=['Individuals', 'Organizations'], key="network_entity_types")
+st.sidebar.slider("Years (Network)", min_value=first_year, max_value=last_year, value=(first_year, last_year), key="network_years")
+st.sidebar.slider("Number of actors", 10, 100, 40, step=5, key="network_nodes")
+
+# Component 1.d, recomputed only when its filters, the article counts or the article and entity files change
+@section("Actor Network", inputs=["network_media", "network_topics", "network_entity_types", "network_years", "network_nodes", "article_counts"],
+         sources=ARTICLE_FILES + [VOCABULARY_FILE, ALIASES_FILE])
+def actor_network(medias, topics, entity_types, years, max_nodes, article_counts):
+    mask = article_mask(medias, topics, years[0], years[1], deduplicated=article_counts == "Deduplicated")
+    entities, counts = comention_counts(mask, [ENTITY_LABELS[entity_type] for entity_type in entity_types])
+    nodes, edges = prune_network(entities, counts, max_nodes)
+    network = network_figure(nodes, edges)
+    network.update_layout(title_text=f"Co-mentions in {mask.sum()} Articles", height=700)
+    return network, top_pairs(nodes, edges)
+
+network, network_pairs = run_section("Actor Network", st.session_state)
+show_chart(network, "Actor Network")
+with st.expander("Most co-mentioned pairs"):
+    st.dataframe(network_pairs)
+
+st.subheader("Coverage Over Time")
+st.markdown("Here, you can follow the number of articles each outlet published per month, week or day. Use the sidebar to choose the topic, the date range and the granularity. CNBC articles only carry an approximate date (the site shows \"2 months ago\"), so CNBC counts are reliable per month but not per week or day.")
+
+# Sidebar for Component 1.c
+st.sidebar.subheader("Coverage Timeline")
+timeline_topic = st.sidebar.selectbox("Choose Topic (Timeline)", ["PLTS", "PLTB"], key="timeline_topic")
+timeline_granularity = st.sidebar.radio("Granularity", list(GRANULARITIES), key="timeline_granularity")
+timeline_dates = st.sidebar.date_input("Date range", (first_day, last_day), min_value=first_day, max_value=last_day, key="timeline_dates")
+
+# Component 1.c, recomputed only when its topic, date range, granularity or the article files change
+@section("Coverage Timeline", inputs=["timeline_topic", "timeline_granularity", "timeline_dates", "article_counts"], sources=ARTICLE_FILES)
+def coverage_timeline(topic, granularity, dates, article_counts):
+    import plotly.graph_objects as go
+
+    # The picker holds a single date while the end of the range is being chosen
+    start, end = (dates[0], dates[-1]) if dates else (first_day, last_day)
+    counts = topic_timeline(topic, granularity, start, end, deduplicated=article_counts == "Deduplicated")
+
+    # Line graph with one line per media
+    timeline = go.Figure([go.Scatter(x=counts.index, y=counts[media], mode='lines', name=media) for media in counts.columns])
+    timeline.update_layout(title_text=f'{topic} Articles per {granularity}', xaxis_title='Date', yaxis_title='Number of Articles')
+    if counts.empty:
+        timeline.add_annotation(text="No publication dates in this range", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5)
+    return timeline
+
+show_chart(run_section("Coverage Timeline", st.session_state), "Coverage Timeline")
+
+# Share of each outlet's articles per year that cover the chosen topic, recomputed only when the topic or the article files change
+@section("Topic Share", inputs=["timeline_topic", "article_counts"], sources=ARTICLE_FILES)
+def topic_share_chart(topic, article_counts):
+    import plotly.graph_objects as go
+
+    share = topic_share(topic, unique_articles(["topic", "media", "year"]) if article_counts == "Deduplicated" else None)
+    topic_share_fig = go.Figure([go.Scatter(x=share.index, y=share[media], mode='lines+markers', name=media) for media in share.columns])
+    topic_share_fig.update_layout(title_text=f'Share of Each Outlet\'s Articles on {topic}', xaxis_title='Year', yaxis_title='Percent of Articles')
+    return topic_share_fig
+
+show_chart(run_section("Topic Share", st.session_state), "Topic Share")
+st.markdown("**Note:** Each line shows, per year, which percentage of an outlet's PLTS and PLTB articles cover the chosen topic.")
+
+# Articles each deduplication rule removes, shown when the sidebar asks for deduplicated counts
+if deduplicated:
+    with st.expander("Duplicate articles removed"):
+        st.markdown("Within each topic, articles sharing a link (ignoring tracking parameters), with the same body, or whose bodies are near-identical (estimated with MinHash over 5-word shingles) are counted once, as their earliest published copy.")
+        st.dataframe(dedup_report())
+
+
+## 1.e Central ideas: the terms that set PLTS and PLTB coverage apart
+
+st.subheader("Central Ideas")
+st.markdown("Here, you can see which words and two-word phrases are most typical of PLTS coverage compared with PLTB coverage, and the other way around. Use the sidebar to choose the outlet, the years and the scoring. Log-odds ranks terms by how much more often one topic uses them than the other, taking into account how often they appear overall; TF-IDF ranks the terms a topic uses most that are not common to every article. The heatmap follows the strongest terms year by year: blue terms lean towards PLTS that year, red terms towards PLTB.")
+
+# Sidebar for Component 1.e
+st.sidebar.subheader("Central Ideas")
+st.sidebar.selectbox("Outlet (Central Ideas)", ["All outlets"] + list(OUTLETS), key="ideas_media")
+st.sidebar.slider("Years (Central Ideas)", min_value=first_year, max_value=last_year, value=(first_year, last_year), key="ideas_years")
+st.sidebar.radio("Scoring", ["log-odds", "tf-idf"], key="ideas_method")
+st.sidebar.slider("Number of terms", 10, 40, 20, step=5, key="ideas_terms")
+
+# Component 1.e, recomputed only when its filters or the article files change; the term counts behind it are
+# stored per file and year and updated incrementally (see salience.py)
+@section("Central Ideas", inputs=["ideas_media", "ideas_years", "ideas_method", "ideas_terms"], sources=ARTICLE_FILES)
+def central_ideas(media, years, method, limit):
+    medias = list(OUTLETS) if media == "All outlets" else [media]
+    figures = []
+    for topic in TOPICS:
+        terms = distinctive_terms(topic, medias, years[0], years[1], limit, method)
+        figure = salience_bar_figure(terms)
+        figure.update_layout(title_text=f"Most Distinctive of {topic} ({media})")
+        figures.append((figure, terms))
+
+    # Top terms of both topics over time, scored as PLTS against PLTB
+    leading = list(dict.fromkeys(term for _, terms in figures for term in terms["Term"][:8]))
+    heatmap = salience_heatmap(salience_over_time(TOPICS[0], medias, leading, years[0], years[1]))
+    heatmap.update_layout(title_text=f"{TOPICS[0]} (blue) vs {TOPICS[1]} (red) Terms per Year ({media})")
+
+    # Leading terms of each outlet side by side
+    outlets = pd.DataFrame({topic: {outlet: ", ".join(distinctive_terms(topic, [outlet], years[0], years[1], 10, method)["Term"])
+                                    for outlet in OUTLETS} for topic in TOPICS})
+    outlets.index.name = "Outlet"
+    return figures[0][0], figures[1][0], heatmap, outlets.reset_index()
+
+ideas_plts, ideas_pltb, ideas_heatmap, ideas_outlets = run_section("Central Ideas", st.session_state)
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(ideas_plts, "Central Ideas PLTS")
+with col2:
+    show_chart(ideas_pltb, "Central Ideas PLTB")
+show_chart(ideas_heatmap, "Central Ideas Over Time")
+with st.expander("Distinctive terms per outlet"):
+    st.dataframe(ideas_outlets)
+
+
+# === COMPONENTS 2 AND 3: COVERAGE PER TOPIC AND OUTLET ===
+
+# Page text and widget keys of each outlet's coverage of a topic. An outlet added to data_store.OUTLETS
+# without an entry here still gets its charts and word cloud, with keys derived from its name and no notes
+COVERAGE_PAGES = {
+    ("PLTS", "Detik"): {
+        "keys": {"start_year": "detik_plts_start_year", "end_year": "detik_plts_end_year", "entity_type": "detik_entity_type", "top_n": "slider1"},
+        "articles": "Here, you can see the distribution of PLTS coverage (both related to PLTS Cirata and not—refer to the keywords provided at the top of the page) across the years.",
+        "articles_note": "**Note**: Detik began discussing solar PV even before 2010, although the coverage was minimal. The attention to this issue increased in 2015 and continued to rise before a decrease in 2019. However, a significant surge was observed in 2020, and the trend has continued to grow until 2022. Data for 2023 is incomplete as I have collected articles only up to August 2023.",
+        "segments_note": "**Note:** Segments might be associated with the departments or focuses of the media outlets. In this case, coverage related to PLTS on Detik.com is predominantly reported by the 'Finance' department, as detikFinance comprises a significant proportion of the overall coverage.",
+        "wordcloud": "Here, stakeholders exclusively identified from the Detik corpus on PLTS are presented. You can choose the number of individuals you wish to observe, ranging from 10 to 100. Hover over the sidebar for customization options",
+    },
+    ("PLTS", "CNBC"): {
+        "keys": {"start_year": "cnbc_plts_start_year", "end_year": "cnbc_plts_end_year", "entity_type": "CNBC PLTS WC", "top_n": "slider2"},
+        "articles": "In the following graph, you can see the number of articles published over the years starting from 2018 to 2023. The media, CNBC Indonesia, itself was launched in 2018. From the onset, they already provided the audience with PLTS-related articles.",
+        "articles_note": "**Note**: the number of articles increased in 2019 but then jumped in 2021 and continue to 2022. This trend is also similar to Detik, where 2021-202 articles increased significantly.",
+        "segments": "Similar to detik.com, CNBC Indonesia has several segments, ranging from Market, News, Tech, Research, Entrepreneur, Lifestyle and Opinion (Opini).",
+        "segments_note": "**Notes:** As you can see, the News Segment reported the most and Market Segment has also contributed to the overall news production.",
+        "wordcloud": "Here, stakeholders exclusively identified from the CNBC corpus on PLTS are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.",
+    },
+    ("PLTS", "Tribun"): {
+        "keys": {"start_year": "tribun_plts_start_year", "end_year": "tribun_plts_end_year", "entity_type": "Tribun PLTS WC", "top_n": "slider3"},
+        "articles": "In the following graph, you can observe the number of articles published by Tribunnews.com. However, please note that the scrapping process for this media outlet is different to two others. I used keywords-related page to retrieve the articles, limiting the comprehensiveness of the data collection due to technical issues. This means that, the actual number of news produced might be larger that the articles collected by me.",
+        "articles_note": "**Notes:** Although 2017 is the year with the most articles published using the keywords, the year 2021 and 2022 are also significant. The trend is also shared by Detik and CNBC Indonesia.)",
+        "wordcloud": "Here, stakeholders identified from the Tribun corpus on PLTS are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.",
+    },
+    ("PLTB", "Detik"): {
+        "keys": {"start_year": "detik_pltb_start_year", "end_year": "detik_pltb_end_year", "entity_type": "Detik PLTB WC", "top_n": "slider Detik PLTB WC"},
+        "articles": "n the following visualization, you will see the number of articles produced by Detik.com under PLTB-related keywords. ",
+        "articles_note": "**Note**: From the graph we learned that the year 2017 and 2018 are the period with the most publication. This might be predicted as PLTB sidrap is launched in this timeframe.",
+        "segments": "Here, you can observe different segments that report on the PLTB on detik.com. From the graph, it’s clear that majority of the news articles are produced by detikFinance and small proportion is contributed by detikNews",
+        "wordcloud": "Key stakeholders identified from Detik's PLTB articles are displayed in this word cloud. Customize the visualization using the sidebar options.",
+    },
+    ("PLTB", "CNBC"): {
+        "keys": {"start_year": "cnbc_pltb_start_year", "end_year": "cnbc_pltb_end_year", "entity_type": "CNBC PLTB WC", "top_n": "slider CNBC PLTB WC"},
+        "articles": "From the onset, CNBC had consistently repored on the wind energy from 2018. Compare to Solar PV, the articles covering wind energy from this media was much more during this year.",
+        "articles_note": "**Note**: From 2018 to 2023, it seems that CNBC produced the most articles in 2022 with more than 450 articles.",
+        "segments": "In the following visualization, you will find various segments within CNBC's departments that report on wind energy. These segments encompass Market, News, Lifestyle, Entrepreneur, Tech, Research, Opini, Cuap Cuap Cuan, and My Money.",
+        "segments_note": "**Note**: The graph reveals that News and Market are the two significant segments reporting on this issue. However, the majority of articles are primarily produced by the News Segment.",
+        "wordcloud": "This word cloud represents key stakeholders mentioned in CNBC's PLTB-related content. Adjust the visualization settings from the sidebar.",
+    },
+    ("PLTB", "Tribun"): {
+        "keys": {"start_year": "tribun_pltb_start_year", "end_year": "tribun_pltb_end_year", "entity_type": "Tribun PLTB WC", "top_n": "slider Tribun PLTB WC"},
+        "articles": "Here, you can observe the number of articles related to wind energy reporting from Tribun. It's important to consider that Tribun likely has different reporting segments for this issue. Unfortunately, I wasn't able to retrieve specific segment data.",
+        "articles_note": "**Note**: As evident, the year 2018 yielded the highest number of articles on wind energy. This could be attributed to the launch of PLTB Sidrap coinciding with that year.",
+        "wordcloud": "Here, stakeholders identified from the Tribun corpus on PLTB are presented. You can choose the number of entities you wish to observe, ranging from 10 to 100. Use the sidebar for customization options.",
+    },
+}
+
+# Title, sidebar title and introduction of each topic's part of the dashboard
+TOPIC_PAGES = {
+    "PLTS": {
+        "title": "PLTS Cirata: Media Coverage Analysis",
+        "sidebar_title": "PLTS Analysis Sidebar",
+        "subheader": "PLTS Coverage",
+        "intro": "In this segment, we will delve into how frequently major Indonesian newspapers cover the topic of PLTS, the segments under which they fall, the key actors frequently referred to, and the primary discussions related to PLTS Cirata. The sequence of media coverage will be as follows: Detik, CNBC, and Tribun. The name of the media source will be prominently displayed on top of the visualizations, along with its content. In some instances, the analysis is still ongoing (such as key ideas), as I require more time to produce a refined result and extrapolate the outcome to the entire dataset.",
+    },
+    "PLTB": {
+        "title": "PLTB Project Analysis",
+        "sidebar_title": "PLTB Analysis Sidebar",
+        "subheader": "PLTB Coverage",
+        "intro": "In this section, you will encounter a similar structure as above with the focus on PLTB reporting. The content includes the number of articles produced, the segment with most publication on the topic, the key actors that are frequently mentioned by the media, and the key ideas surrounding these articles.",
+    },
+}
+
+
+# Function to return the widget keys of an outlet's coverage section
+def coverage_keys(topic, media):
+    default = {"start_year": f"{media.lower()}_{topic.lower()}_start_year", "end_year": f"{media.lower()}_{topic.lower()}_end_year",
+               "entity_type": f"{media} {topic} WC", "top_n": f"slider {media} {topic} WC"}
+    return COVERAGE_PAGES.get((topic, media), {}).get("keys", default)
+
+
+# Function to register an outlet's coverage section, recomputed only when its year range, the article counts or the topic's article files change
+def register_coverage(topic, media):
+    keys = coverage_keys(topic, media)
+    has_segments = "segment" in OUTLETS[media]["columns"]
+
+    def coverage(start_year, end_year, article_counts):
+        counts = segment_counts(topic, media, start_year, end_year, deduplicated=article_counts == "Deduplicated")
+        # Histogram for the number of articles
+        articles = year_bar_figure(counts.sum(axis=1))
+        articles.update_layout(bargap=0.1, xaxis_title="Year", yaxis_title="Number of Articles")
+        if not has_segments:
+            return articles, None
+        # Histogram by segment
+        segments = segment_bar_figure(counts)
+        segments.update_layout(bargap=0.1)
+        return articles, segments
+
+    # Deduplicated counts also depend on the other outlets' articles on the topic
+    register_section(f"{media} {topic} Coverage", coverage, inputs=[keys["start_year"], keys["end_year"], "article_counts"],
+                     sources=[path for (source_topic, _), path in ARTICLE_SOURCES.items() if source_topic == topic])
+
+
+# Function to display an outlet's coverage of a topic: year range, articles per year and segment, and word cloud
+def outlet_coverage(topic, media):
+    page = COVERAGE_PAGES.get((topic, media), {})
+    keys = coverage_keys(topic, media)
+
+    # Sidebar Feature for the outlet's date range
+    st.sidebar.subheader(f"{media} {topic} Analysis - Date Range")
+    st.sidebar.slider(f"Start Year - {media}", min_value=first_year, max_value=last_year, value=first_year, key=keys["start_year"])
+    st.sidebar.slider(f"End Year - {media}", min_value=first_year, max_value=last_year, value=last_year, key=keys["end_year"])
+
+    register_coverage(topic, media)
+    articles, segments = run_section(f"{media} {topic} Coverage", st.session_state)
+
+    st.subheader(f"{media} {topic} Analysis: Number of Articles")
+    if "articles" in page:
+        st.markdown(page["articles"])
+    show_chart(articles, f"{media} {topic} Articles")
+    if "articles_note" in page:
+        st.markdown(page["articles_note"])
+
+    if segments is not None:
+        st.subheader(f"{media} {topic} Analysis: Articles by Segment")
+        if "segments" in page:
+            st.markdown(page["segments"])
+        show_chart(segments, f"{media} {topic} Segments")
+        if "segments_note" in page:
+            st.markdown(page["segments_note"])
+
+    # Outlets without an entity count file for the topic have no word cloud
+    if f"{media} {topic}" not in COUNT_FILES:
+        return
+
+    # Sidebar for the outlet's Word Cloud
+    st.sidebar.subheader(f"{media} {topic}: Word Cloud")
+    entity_type = st.sidebar.selectbox(f"Choose Entity Type for {media}", ['Individuals', 'Organizations'], key=keys["entity_type"])
+    top_n = st.sidebar.slider(f'Choose top N entities for {media} word cloud', 10, 100, 50, key=keys["top_n"])
+
+    # Word Cloud Visualization
+    st.subheader(f"{media} {topic} - Word Cloud: Top {top_n} {entity_type}")
+    generate_wordcloud(COUNT_FILES[f"{media} {topic}"], keys["entity_type"], keys["top_n"])
+    if "wordcloud" in page:
+        st.markdown(page["wordcloud"])
+
+
+for topic in TOPICS:
+    page = TOPIC_PAGES.get(topic, {})
+
+    # Dashboard Title
+    st.title(page.get("title", f"{topic} Coverage Analysis"))
+
+    # Sidebar Title
+    st.sidebar.title(page.get("sidebar_title", f"{topic} Analysis Sidebar"))
+
+    # Context for the topic's coverage
+    st.subheader(page.get("subheader", f"{topic} Coverage"))
+    if "intro" in page:
+        st.markdown(page["intro"])
+
+    for media in OUTLETS:
+        if (topic, media) in ARTICLE_SOURCES:
+            outlet_coverage(topic, media)
 
 
 # Add a separation between the previous content and the attribution
@@ -479,3 +502,40 @@ st.write("----")
 
 # Attribution
 st.markdown("This dashboard is designed and developed by **taufik.impact@gmail.com** for the Market, Society, and Policy Department under DTU Wind & Energy Systems.")
+
+
+# === DEBUG PANEL ===
+
+# Sidebar for performance debugging
+st.sidebar.subheader("Debug")
+show_debug = st.sidebar.checkbox("Show performance panel", False, key="debug_panel")
+if show_debug:
+    st.sidebar.button("Profile this rerun", key="debug_profile")
+
+rerun_metrics = end_rerun(getattr(get_script_run_ctx(), "session_id", None))
+profile = stop_profile(profiler) if profiler is not None else None
+
+# Spans of this rerun (nested ones indented), counters and process-wide cache stats
+if show_debug and rerun_metrics is not None:
+    st.sidebar.markdown(f"**This rerun:** {rerun_metrics['total_ms']:.0f} ms")
+    st.sidebar.dataframe(pd.DataFrame([{"Step": "\u2003" * item["depth"] + item["name"], "ms": item["ms"]}
+                                       for item in rerun_metrics["spans"]], columns=["Step", "ms"]))
+    st.sidebar.json(rerun_metrics["counters"])
+    st.sidebar.markdown("**Caches since start**")
+    st.sidebar.json({"sections": section_stats(), "word clouds": cache_stats(),
+                     "datasets": dict(REGISTRY.stats, memory_bytes=REGISTRY.memory_bytes())})
+    st.sidebar.dataframe(pd.DataFrame(REGISTRY.datasets(), columns=["entry", "columns", "bytes"]))
+    if profile is not None:
+        profile_path, profile_summary = profile
+        st.sidebar.markdown("**Profile** (open the .prof file with snakeviz or flameprof for a flame graph)")
+        st.sidebar.code(profile_summary)
+        with open(profile_path, "rb") as handle:
+            st.sidebar.download_button("Download profile", handle.read(), file_name=os.path.basename(profile_path))
+
+
+# === WARM-UP ===
+
+# With MEDIA_WARMUP set, the first run to finish starts loading what other views need (deduplicated counts,
+# every entity ranking, the co-occurrence matrices) in the background; it starts only now so it does not
+# compete with the first page. Run "python warmup.py" before "streamlit run" to build the disk caches at deploy
+start_warmup()
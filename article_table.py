@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+
+from data_store import ARTICLE_SOURCES, OUTLETS, TOPICS, file_hash, snapshot_columns
+from dataset_registry import derived, get_dataset
+from instrumentation import span
+
+
+# === UNIFIED ARTICLE TABLE ===
+
+# Columns of the article table: topic and media, then the outlet columns mapped in data_store.OUTLETS,
+# then the columns every snapshot carries
+ARTICLE_COLUMNS = ["topic", "media", "title", "link", "description", "text", "segment", "published", "year"]
+SNAPSHOT_COLUMNS = {"published": "Published", "year": "Year"}
+
+# Segment of the articles of outlets without segments
+NO_SEGMENT = "(none)"
+
+# Columns never kept in the dataset registry: a table with the article bodies is built for its caller and
+# released with it
+UNMEMOIZED_COLUMNS = {"text"}
+
+
+# Function to load one article file under the canonical column names (columns it lacks are left empty)
+def _outlet_frame(path: str, topic: str, media: str, columns: list) -> pd.DataFrame:
+    mapping = dict(OUTLETS[media]["columns"], **SNAPSHOT_COLUMNS)
+    available = snapshot_columns(path)
+    wanted = [column for column in columns if column not in ("topic", "media")]
+    sources = {column: mapping[column] for column in wanted if mapping.get(column) in available}
+    # Year is read even when only topic and media are asked for, to know the number of rows
+    articles = get_dataset(path, list(sources.values()) or ["Year"])
+
+    frame = articles[list(sources.values())].set_axis(list(sources), axis=1)
+    for column in wanted:
+        if column not in frame:
+            frame[column] = NO_SEGMENT if column == "segment" else None
+    frame["topic"] = topic
+    frame["media"] = media
+    return frame[columns]
+
+
+# Function to build the article table of every outlet and topic in one frame with categorical topic, media
+# and segment columns; only the requested columns are read
+def build_article_table(columns: list = None, sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    columns = [column for column in ARTICLE_COLUMNS if columns is None or column in columns]
+    frames = [_outlet_frame(path, topic, media, columns)
+              for (topic, media), path in sources.items() if os.path.exists(path)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    table = pd.concat(frames, ignore_index=True)
+
+    medias = list(dict.fromkeys(list(OUTLETS) + [media for _, media in sources]))
+    if "topic" in table:
+        topics = list(dict.fromkeys(TOPICS + [topic for topic, _ in sources]))
+        table["topic"] = pd.Categorical(table["topic"], categories=topics)
+    if "media" in table:
+        table["media"] = pd.Categorical(table["media"], categories=medias)
+    if "segment" in table:
+        # Categories in order of first appearance, as px.histogram orders its legend
+        segment = table["segment"].astype(object).where(table["segment"].notna(), NO_SEGMENT).astype(str)
+        table["segment"] = pd.Categorical(segment, categories=pd.unique(segment))
+    if "year" in table:
+        table["year"] = table["year"].astype("Int16")
+    if "published" in table:
+        table["published"] = pd.to_datetime(table["published"])
+    return table
+
+
+# Function to return the article table, kept in the dataset registry and rebuilt only when one of the article
+# files changed
+def article_table(columns: list = None, sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    if UNMEMOIZED_COLUMNS & set(ARTICLE_COLUMNS if columns is None else columns):
+        with span("article table build"):
+            return build_article_table(columns, sources)
+    key = (tuple(columns) if columns is not None else None, tuple(sources.items()))
+    digest = tuple(file_hash(path) for path in sources.values() if os.path.exists(path))
+
+    def build():
+        with span("article table build"):
+            return build_article_table(columns, sources)
+
+    return derived("article table", key, digest, build)
+
+
+# Function to compute each outlet's share of its articles per topic and year, in one groupby over the table
+def topic_share(topic: str, table: pd.DataFrame = None) -> pd.DataFrame:
+    table = article_table(["topic", "media", "year"]) if table is None else table
+    counts = table.dropna(subset=["year"]).groupby(["media", "year", "topic"], observed=True).size()
+    totals = counts.groupby(level=["media", "year"], observed=True).transform("sum")
+    share = (counts / totals * 100).xs(topic, level="topic")
+    return share.unstack("media").fillna(0).sort_index()
@@ -0,0 +1,91 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+from data_store import write_bytes, write_json
+
+
+# === PRE-RENDERED SECTION ARTIFACTS ===
+
+# Static site written by export_site.py; the dashboard serves a section from it when its widget values,
+# code and data files match a pre-rendered artifact
+SITE_DIR = os.environ.get("MEDIA_SITE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "site"))
+ARTIFACTS_DIR = os.path.join(SITE_DIR, "artifacts")
+
+# Bump when the artifact format changes so older exports are ignored
+ARTIFACT_VERSION = 1
+
+
+# Function to name the artifact of a section key (name, code id, widget values, data file hashes). The code id
+# covers the app's module sources and APP_VERSION (see sections.py), so a deploy with changed code never
+# serves artifacts exported by the old code
+def artifact_id(key: tuple) -> str:
+    return hashlib.sha1(f"{ARTIFACT_VERSION}|{key!r}".encode("utf-8")).hexdigest()
+
+
+# Function to turn section outputs into JSON, collecting PNG bytes as separate files
+def _encode(value, name: str, files: dict):
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        filename = f"{name}-{len(files)}.png"
+        files[filename] = value
+        return {"png": filename}
+    if isinstance(value, pd.DataFrame):
+        return {"table": json.loads(value.to_json(orient="split", date_format="iso"))}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item, name, files) for item in value]}
+    if hasattr(value, "to_plotly_json"):
+        import plotly.io as pio
+
+        return {"figure": json.loads(pio.to_json(value, validate=False))}
+    raise TypeError(f"cannot pre-render a section output of type {type(value).__name__}")
+
+
+def _decode(value, directory: str):
+    if value is None:
+        return None
+    if "png" in value:
+        with open(os.path.join(directory, value["png"]), "rb") as handle:
+            return handle.read()
+    if "table" in value:
+        return pd.read_json(io.StringIO(json.dumps(value["table"])), orient="split")
+    if "tuple" in value:
+        return tuple(_decode(item, directory) for item in value["tuple"])
+    import plotly.io as pio
+
+    return pio.from_json(json.dumps(value["figure"]), skip_invalid=True)
+
+
+# Function to write a section's outputs as <id>.json (Plotly JSON, tables) plus <id>-<n>.png files.
+# Returns the names of the files written
+def save_artifact(key: tuple, outputs, directory: str = ARTIFACTS_DIR) -> list:
+    name = artifact_id(key)
+    files = {}
+    encoded = {"section": key[0], "values": repr(key[2]), "outputs": _encode(outputs, name, files)}
+    os.makedirs(directory, exist_ok=True)
+    for filename, png in files.items():
+        write_bytes(os.path.join(directory, filename), png)
+    # The JSON goes last so a reader never finds it without its PNGs
+    write_json(os.path.join(directory, name + ".json"), encoded)
+    return list(files) + [name + ".json"]
+
+
+# Function to return the raw JSON of a section's artifact, or None when it was not pre-rendered
+def read_artifact(key: tuple, directory: str = ARTIFACTS_DIR):
+    path = os.path.join(directory, artifact_id(key) + ".json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+# Function to return a section's pre-rendered outputs, or None when there is no artifact for its key
+def load_artifact(key: tuple, directory: str = ARTIFACTS_DIR):
+    stored = read_artifact(key, directory)
+    if stored is None:
+        return None
+    return _decode(stored["outputs"], directory)
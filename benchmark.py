@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import plotly.express as px
+
+import data_store
+from count_cube import build_cube, segment_bar_figure, segment_counts, year_bar_figure
+from data_store import ARTICLE_SOURCES, build_snapshot, load_columns, snapshot_columns
+from dataset_registry import REGISTRY
+from entity_index import COUNT_FILES, ENTITY_LABELS, EntityIndex
+from entity_normalize import normalize_counts
+from wordcloud_cache import render_png
+
+
+# === BENCHMARK SUITE ===
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# A stage regresses when it is this much slower than its baseline ...
+DEFAULT_THRESHOLD = 0.5
+# ... and at least this many seconds slower, so timer noise on tiny stages is ignored
+MIN_REGRESSION_SECONDS = 0.005
+
+# Stages timing code the dashboard no longer runs, kept to show what the current code is compared against.
+# They are reported but never fail the regression check
+REFERENCE_STAGES = {"csv_load", "entity_groupby_sort", "top_n_sorted_dict", "histogram_px_reference"}
+
+# Synthetic corpora keep this much of each article body, so 100x stays a manageable size on disk
+SYNTHETIC_TEXT_CHARS = 500
+TEXT_COLUMNS = ["Article", "content", "Description"]
+
+
+# Function to time a callable, returning the best of several repeats in seconds
+def measure(function, repeat: int = 3, number: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+# Function to write a corpus scaled by a factor: article rows are replicated and entity vocabularies grown
+def build_scaled_corpus(scale: int, directory: str) -> tuple:
+    sources = {}
+    for key, path in ARTICLE_SOURCES.items():
+        if not os.path.exists(path):
+            continue
+        articles = pd.read_csv(path)
+        for column in TEXT_COLUMNS:
+            if column in articles:
+                articles[column] = articles[column].astype(str).str.slice(0, SYNTHETIC_TEXT_CHARS)
+        link = "Link" if "Link" in articles else "link"
+        copies = []
+        for copy in range(scale):
+            replica = articles.copy()
+            replica[link] = replica[link].astype(str) + f"?copy={copy}"
+            copies.append(replica)
+        target = os.path.join(directory, os.path.basename(path))
+        pd.concat(copies, ignore_index=True).to_csv(target, index=False)
+        sources[key] = target
+
+    count_files = {}
+    for name, path in COUNT_FILES.items():
+        counts = pd.read_csv(path)
+        copies = [counts] + [counts.assign(Entity=counts["Entity"].astype(str) + f" {copy}") for copy in range(1, scale)]
+        target = os.path.join(directory, os.path.basename(path))
+        pd.concat(copies, ignore_index=True).to_csv(target, index=False)
+        count_files[name] = target
+    return sources, count_files
+
+
+# Function to time every dashboard stage against one corpus
+def run_stages(sources: dict, count_files: dict, repeat: int, wordcloud: bool) -> dict:
+    results = {}
+
+    # CSV and snapshot loads per article file
+    for (topic, media), path in sources.items():
+        name = os.path.basename(path)
+        results[f"csv_load/{name}"] = measure(lambda: pd.read_csv(path), repeat)
+        results[f"snapshot_build/{name}"] = measure(lambda: build_snapshot(path), 1)
+        columns = ["Year"] + (["Segment"] if "Segment" in snapshot_columns(path) else [])
+        results[f"snapshot_load/{name}"] = measure(lambda: load_columns(path, columns), repeat)
+
+    # Histograms: the cube, pre-binned figures and their Plotly JSON. Every cube run rebuilds the article
+    # table (the registry would otherwise serve the repeats) but reuses the shared datasets, as a dashboard rerun does
+    def cold_cube():
+        REGISTRY.clear_derived()
+        return build_cube(sources)
+
+    results["cube_build"] = measure(cold_cube, repeat)
+    cube = build_cube(sources)
+    figures = []
+
+    def histogram_figures():
+        figures.clear()
+        for topic, media in sources:
+            counts = segment_counts(topic, media, 2000, 2023, cube)
+            figures.append(year_bar_figure(counts.sum(axis=1)))
+            figures.append(segment_bar_figure(counts))
+
+    results["histogram_figures"] = measure(histogram_figures, repeat)
+    results["plotly_json"] = measure(lambda: [figure.to_json() for figure in figures], repeat)
+
+    # The previous per-article px.histogram, for comparison with the cube
+    raw = {key: load_columns(path, ["Year"] + (["Segment"] if "Segment" in snapshot_columns(path) else []))
+           for key, path in sources.items()}
+    results["histogram_px_reference"] = measure(
+        lambda: [px.histogram(frame, x="Year", color="Segment" if "Segment" in frame else None).to_json()
+                 for frame in raw.values()], 1)
+
+    # Key Actors: the old groupby/filter/sort against the ranking index
+    for name, path in count_files.items():
+        counts = pd.read_csv(path)
+        stage = os.path.basename(path)
+
+        def groupby_sort():
+            for label in ENTITY_LABELS.values():
+                grouped = counts[counts["NER_Label"] == label].groupby("Entity")["Counts"].sum().reset_index()
+                grouped[grouped["Counts"] >= 2].sort_values(by="Counts", ascending=False)
+
+        results[f"entity_groupby_sort/{stage}"] = measure(groupby_sort, repeat)
+        results[f"entity_index_build/{stage}"] = measure(lambda: EntityIndex(normalize_counts(counts)[0], 2), repeat)
+        index = EntityIndex(normalize_counts(counts)[0], 2)
+        results[f"top_n/{stage}"] = measure(lambda: index.top_n("B-ORG", 50), repeat, number=100)
+
+        freq = counts[counts["NER_Label"] == "B-ORG"].set_index("Entity")["Counts"].to_dict()
+        results[f"top_n_sorted_dict/{stage}"] = measure(
+            lambda: dict(sorted(freq.items(), key=lambda item: item[1], reverse=True)[:50]), repeat)
+
+    # Word cloud layout only depends on the top N, not on the corpus size
+    if wordcloud:
+        frequencies = EntityIndex(normalize_counts(pd.read_csv(count_files["Overall PLTS"]))[0], 2).top_n("B-ORG", 50)
+        results["wordcloud_layout"] = measure(lambda: render_png(frequencies), repeat)
+
+    return results
+
+
+# Function to run the suite at every scale, returning {"<scale>x/<stage>": seconds}
+def run_benchmarks(scales=(1, 10, 100), repeat: int = 3) -> dict:
+    results = {}
+    snapshot_dir = data_store.SNAPSHOT_DIR
+    for scale in scales:
+        directory = tempfile.mkdtemp(prefix=f"bench{scale}x-")
+        # Keep the synthetic snapshots away from the dashboard's own
+        data_store.SNAPSHOT_DIR = os.path.join(directory, ".snapshots")
+        try:
+            started = time.perf_counter()
+            sources, count_files = build_scaled_corpus(scale, directory)
+            print(f"{scale}x corpus written in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            stages = run_stages(sources, count_files, repeat if scale < 100 else 1, wordcloud=scale == 1)
+            results.update({f"{scale}x/{stage}": round(seconds, 6) for stage, seconds in stages.items()})
+        finally:
+            data_store.SNAPSHOT_DIR = snapshot_dir
+            shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+# Function to tell whether a "<scale>x/<stage>[/<file>]" result times a reference stage
+def is_reference(stage: str) -> bool:
+    parts = stage.split("/")
+    return len(parts) > 1 and parts[1] in REFERENCE_STAGES
+
+
+# Function to list the stages the dashboard runs that got slower than the baseline beyond the threshold
+def regressions(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+                min_seconds: float = MIN_REGRESSION_SECONDS) -> list:
+    slower = []
+    for stage, seconds in results.items():
+        reference = baseline.get(stage)
+        if reference is None or is_reference(stage):
+            continue
+        if seconds > reference * (1 + threshold) and seconds - reference > min_seconds:
+            slower.append({"stage": stage, "baseline": reference, "current": seconds,
+                           "ratio": round(seconds / reference, 2)})
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each dashboard stage and compare against the baseline.")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated corpus scale factors")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per stage (best is kept)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a stage counts as regressed (0.5 = 50%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--output", help="write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    results = run_benchmarks([int(scale) for scale in args.scales.split(",")], args.repeat)
+    for stage, seconds in results.items():
+        print(f"{stage:60s} {seconds * 1000:10.2f} ms" + ("  (reference, not checked)" if is_reference(stage) else ""))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        sys.exit(0)
+    with open(args.baseline) as handle:
+        slower = regressions(results, json.load(handle), args.threshold)
+    for regression in slower:
+        print(f"REGRESSION {regression['stage']}: {regression['baseline'] * 1000:.2f} ms -> "
+              f"{regression['current'] * 1000:.2f} ms ({regression['ratio']}x)")
+    sys.exit(1 if slower else 0)
@@ -0,0 +1,294 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from article_table import article_table
+from data_store import (ARTICLE_SOURCES, OUTLETS, TEXT_COLUMNS, atomic_write, file_hash, load_columns,
+                        snapshot_columns, write_json)
+from dataset_registry import derived
+from dedup import get_duplicates
+from entity_normalize import load_aliases, normalization_id, normalize_entities
+from instrumentation import span
+from ner_pipeline import GAZETTEER_FILE, DictionaryExtractor, tokenize
+
+
+# === ACTOR CO-OCCURRENCE NETWORK ===
+
+# Known entities: the NER pipeline's gazetteer
+VOCABULARY_FILE = GAZETTEER_FILE
+
+MENTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "cooccurrence")
+
+# Bump when the incidence rules change so stored matrices are rebuilt
+COOCCURRENCE_VERSION = 2
+
+# Actors are the gazetteer names written with a capital letter in at least this share of their mentions, and
+# they are matched only as written that way, so "Dunia" in a name is an actor and "dunia" (world) is not
+ACTOR_MIN_CAPITALIZED = 0.5
+
+# Titles, institution and place nouns, months, weekdays, compass points, units and page boilerplate that are capitalized as part of
+# names but are not actors on their own; a name made only of these words is left out
+GENERIC_WORDS = frozenset("""
+presiden wakil menteri direktur dirjen kepala ketua gubernur bupati walikota wali koordinator ceo utama komisaris
+kementerian kemen badan direktorat ditjen dewan komisi biro asosiasi forum universitas pusat bank group grup persero
+tbk pt international national energy power wind solar surya bayu uni star sun the pemerintah pemda negara
+desa kabupaten kota provinsi kecamatan kampung kelurahan dunia industri
+januari februari maret april mei juni juli agustus september oktober november desember
+senin selasa rabu kamis jumat sabtu minggu utara selatan timur barat tengah
+mw kw gw mwp kwp kwh mwh gwh us usd rp wib persen
+resume content redaksi cnbcindonesia hal mou corona
+""".split())
+
+# Only the entities mentioned in the most articles of the selection enter the co-mention product, so its
+# cost is bounded by this many columns however large the vocabulary grows
+MAX_CANDIDATES = 500
+
+# Entities named in more than this share of the selected articles ("dan", "jakarta", page boilerplate the NER
+# tagged) co-occur with everything and are left out, like max_df in TF-IDF
+MAX_ARTICLE_SHARE = 0.25
+
+# Entity type of each NER label, as named in the sidebar
+LABEL_NAMES = {"B-PER": "Individuals", "B-ORG": "Organizations"}
+
+_vocabulary_memo = {}
+
+
+# Function to read the actors of the gazetteer as {NER_Label: {name as written: count}}
+def load_actors(path: str = GAZETTEER_FILE) -> dict:
+    gazetteer = pd.read_csv(path, keep_default_na=False)
+    actors = gazetteer[(gazetteer["Capitalized"] >= ACTOR_MIN_CAPITALIZED) & gazetteer["Entity"].str[:1].str.isupper()]
+    generic = np.array([all(token in GENERIC_WORDS or not token.isalnum() for token in tokenize(entity))
+                        for entity in actors["Entity"]], dtype=bool)
+    actors = actors[~generic]
+    return {label: dict(zip(group["Entity"], group["Counts"])) for label, group in actors.groupby("NER_Label")}
+
+
+class Vocabulary:
+    # The actors of the NER gazetteer, matched case-sensitively, with each name mapped to a column of the
+    # incidence matrix. Spelling variants and aliases share a column (see entity_normalize), shown by the
+    # variant counted most often
+
+    def __init__(self, path: str = VOCABULARY_FILE):
+        actors = load_actors(path)
+        self.extractor = DictionaryExtractor(actors, case_sensitive=True)
+        found = self.extractor.vocabulary()
+        names = pd.Series([name for _, name in found], dtype=object)
+        canonical = normalize_entities(names, load_aliases()) if len(names) else names
+
+        # One column per (label, canonical name); noise tokens get none
+        entities = pd.DataFrame({"label": [label for label, _ in found], "entity": canonical, "name": names,
+                                 "count": [actors[label][name] for label, name in found]}).dropna()
+        self.entities = (entities.sort_values("count", ascending=False, kind="stable")
+                         .drop_duplicates(["label", "entity"]).sort_index()[["label", "entity", "name"]]
+                         .reset_index(drop=True))
+        columns = {key: column for column, key in enumerate(zip(self.entities["label"], self.entities["entity"]))}
+        self.columns = {found[position]: columns[(label, entity)]
+                        for position, label, entity in zip(entities.index, entities["label"], entities["entity"])}
+        self.cache_id = hashlib.sha1(
+            f"{COOCCURRENCE_VERSION}|{self.extractor.cache_id}|{normalization_id()}".encode("utf-8")).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    # Function to build the binary article x entity matrix of a list of texts (1 where the article names the entity)
+    def incidence(self, texts) -> "sparse.csr_matrix":
+        from scipy import sparse
+
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            mentioned = {self.columns[(label, entity)] for label, entity, _ in self.extractor.matches(text)
+                         if (label, entity) in self.columns}
+            rows.extend([row] * len(mentioned))
+            columns.extend(mentioned)
+        data = np.ones(len(rows), dtype=np.int32)
+        return sparse.csr_matrix((data, (rows, columns)), shape=(len(texts), len(self)), dtype=np.int32)
+
+
+# Function to return the vocabulary, rebuilt only when the gazetteer or the alias table changes
+def get_vocabulary(path: str = VOCABULARY_FILE) -> Vocabulary:
+    key = (path, file_hash(path) if os.path.exists(path) else None, normalization_id())
+    if _vocabulary_memo.get("key") != key:
+        with span("cooccurrence vocabulary"):
+            _vocabulary_memo["vocabulary"] = Vocabulary(path)
+        _vocabulary_memo["key"] = key
+    return _vocabulary_memo["vocabulary"]
+
+
+def _incidence_path(path: str, vocabulary: Vocabulary) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(MENTIONS_DIR, f"{name}-{vocabulary.cache_id}.npz")
+
+
+# Function to read the stored incidence matrix of one article file, extracting and storing it when stale
+def _load_incidence(path: str, vocabulary: Vocabulary, digest: str) -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    stored_path = _incidence_path(path, vocabulary)
+    meta_path = stored_path[:-len(".npz")] + ".json"
+    if os.path.exists(stored_path) and os.path.exists(meta_path):
+        with open(meta_path) as handle:
+            if json.load(handle).get("hash") == digest:
+                return sparse.load_npz(stored_path).tocsr()
+    text_column = next(column for column in TEXT_COLUMNS if column in snapshot_columns(path))
+    with span(f"cooccurrence extract {os.path.basename(path)}"):
+        texts = load_columns(path, [text_column])[text_column].fillna("").astype(str)
+        matrix = vocabulary.incidence(texts)
+    os.makedirs(MENTIONS_DIR, exist_ok=True)
+    atomic_write(stored_path, lambda temporary: sparse.save_npz(temporary, matrix))
+    write_json(meta_path, {"hash": digest, "path": os.path.basename(path)})
+    return matrix
+
+
+# Function to return the incidence matrix of one article file (rows in file order), stored per file hash
+# and kept in the dataset registry
+def get_incidence(path: str, vocabulary: Vocabulary = None) -> "sparse.csr_matrix":
+    vocabulary = get_vocabulary() if vocabulary is None else vocabulary
+    digest = file_hash(path)
+    return derived("incidence", path, (digest, vocabulary.cache_id),
+                   lambda: _load_incidence(path, vocabulary, digest))
+
+
+# Function to stack the incidence matrices of the article files in article table order
+def incidence_matrix(sources: dict = ARTICLE_SOURCES) -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    vocabulary = get_vocabulary()
+    matrices = [get_incidence(path, vocabulary) for path in sources.values() if os.path.exists(path)]
+    if not matrices:
+        return sparse.csr_matrix((0, len(vocabulary)), dtype=np.int32)
+    return sparse.vstack(matrices, format="csr")
+
+
+# Function to select the articles of some outlets and topics published in a year range
+def article_mask(medias: list, topics: list, start_year: int, end_year: int, deduplicated: bool = False,
+                 sources: dict = ARTICLE_SOURCES) -> np.ndarray:
+    table = article_table(["topic", "media", "year"], sources)
+    years = table["year"]
+    mask = (table["media"].isin(medias) & table["topic"].isin(topics)
+            & years.between(start_year, end_year).fillna(False)).to_numpy(dtype=bool)
+    if deduplicated:
+        mask &= ~get_duplicates(sources)["duplicate"].to_numpy()
+    return mask
+
+
+# Function to count co-mentions among the most mentioned entities of the selected articles.
+# Returns the entities (label, entity, articles) and their symmetric co-mention matrix, zero diagonal
+def comention_counts(mask: np.ndarray, labels: list = None, max_candidates: int = MAX_CANDIDATES,
+                     max_share: float = MAX_ARTICLE_SHARE) -> tuple:
+    vocabulary = get_vocabulary()
+    selected = incidence_matrix()[mask]
+    mentions = np.asarray(selected.sum(axis=0)).ravel()
+    eligible = mentions <= max_share * selected.shape[0]
+    if labels is not None:
+        eligible &= vocabulary.entities["label"].isin(labels).to_numpy()
+
+    candidates = np.flatnonzero(eligible & (mentions > 0))
+    candidates = candidates[np.argsort(-mentions[candidates], kind="stable")][:max_candidates]
+    with span("cooccurrence product"):
+        subset = selected[:, candidates]
+        # Sparse product: cost grows with the mentions in the selection, not with the square of the vocabulary
+        counts = (subset.T @ subset).tocsr()
+        counts.setdiag(0)
+        counts.eliminate_zeros()
+
+    entities = vocabulary.entities.iloc[candidates].reset_index(drop=True)
+    entities["articles"] = mentions[candidates]
+    return entities, counts
+
+
+# Function to prune the co-mention graph: the max_nodes most mentioned entities, edges of at least min_weight
+# co-mentions, each node keeping only its edges_per_node strongest edges, isolated nodes dropped
+def prune_network(entities: pd.DataFrame, counts: "sparse.csr_matrix", max_nodes: int = 40, min_weight: int = 2,
+                  edges_per_node: int = 5) -> tuple:
+    nodes = min(max_nodes, len(entities))
+    counts = counts[:nodes, :nodes].tocoo()
+    edges = pd.DataFrame({"source": counts.row, "target": counts.col, "weight": counts.data})
+    edges = edges[(edges["source"] < edges["target"]) & (edges["weight"] >= min_weight)]
+
+    # An edge survives when it is among the strongest edges of either endpoint
+    both = pd.concat([edges, edges.rename(columns={"source": "target", "target": "source"})])
+    strongest = both.sort_values("weight", ascending=False, kind="stable").groupby("source").head(edges_per_node)
+    kept = set(zip(strongest[["source", "target"]].min(axis=1), strongest[["source", "target"]].max(axis=1)))
+    edges = edges[np.array([pair in kept for pair in zip(edges["source"], edges["target"])], dtype=bool)]
+
+    connected = np.union1d(edges["source"], edges["target"]).astype(np.int64)
+    renumber = {node: position for position, node in enumerate(connected)}
+    edges = edges.assign(source=edges["source"].map(renumber), target=edges["target"].map(renumber))
+    return entities.iloc[connected].reset_index(drop=True), edges.reset_index(drop=True)
+
+
+# Function to place the nodes with a force-directed layout (Fruchterman-Reingold, fixed seed so reruns agree)
+def network_layout(count: int, edges: pd.DataFrame, iterations: int = 200, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-1, 1, (count, 2))
+    if count < 2:
+        return positions
+    weights = np.zeros((count, count))
+    weights[edges["source"], edges["target"]] = edges["weight"]
+    weights = weights + weights.T
+    weights = weights / weights.max() if weights.max() else weights
+    spacing = 1 / np.sqrt(count)
+    temperature = 0.1
+    for _ in range(iterations):
+        delta = positions[:, None, :] - positions[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 1e-3)
+        # Repulsion between every pair, attraction along edges proportional to their weight
+        force = spacing ** 2 / distance ** 2 - weights * distance / spacing
+        displacement = (delta * force[:, :, None]).sum(axis=1)
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        positions += displacement / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature *= 0.98
+    return positions
+
+
+# Function to draw the pruned network: edge width by co-mentions, node size by articles, colour by entity type
+def network_figure(nodes: pd.DataFrame, edges: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    positions = network_layout(len(nodes), edges)
+    figure = go.Figure()
+    top = edges["weight"].max() if len(edges) else 1
+    for source, target, weight in edges[["source", "target", "weight"]].itertuples(index=False):
+        figure.add_trace(go.Scatter(
+            x=[positions[source, 0], positions[target, 0]], y=[positions[source, 1], positions[target, 1]],
+            mode="lines", line={"width": 0.5 + 4 * weight / top, "color": "rgba(120, 120, 120, 0.5)"},
+            hoverinfo="skip", showlegend=False))
+    size = 10 + 30 * np.sqrt(nodes["articles"] / nodes["articles"].max()) if len(nodes) else []
+    for label, name in LABEL_NAMES.items():
+        chosen = (nodes["label"] == label).to_numpy()
+        if not chosen.any():
+            continue
+        figure.add_trace(go.Scatter(
+            x=positions[chosen, 0], y=positions[chosen, 1], mode="markers+text", name=name,
+            text=nodes["name"][chosen], textposition="top center", marker={"size": np.asarray(size)[chosen]},
+            customdata=nodes["articles"][chosen],
+            hovertemplate="%{text}<br>%{customdata} articles<extra></extra>"))
+    figure.update_layout(xaxis={"visible": False}, yaxis={"visible": False}, legend_title_text="Entity type")
+    return figure
+
+
+# Function to list the strongest co-mentioned pairs by name
+def top_pairs(nodes: pd.DataFrame, edges: pd.DataFrame, limit: int = 20) -> pd.DataFrame:
+    pairs = edges.sort_values("weight", ascending=False, kind="stable").head(limit)
+    return pd.DataFrame({"Entity": nodes["name"].to_numpy()[pairs["source"]],
+                         "Co-mentioned with": nodes["name"].to_numpy()[pairs["target"]],
+                         "Articles": pairs["weight"].to_numpy()})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the most co-mentioned actors of a selection of articles.")
+    parser.add_argument("--media", nargs="+", default=list(OUTLETS))
+    parser.add_argument("--topics", nargs="+", default=sorted({topic for topic, _ in ARTICLE_SOURCES}))
+    parser.add_argument("--years", nargs=2, type=int, default=[1900, 2100], metavar=("START", "END"))
+    parser.add_argument("--nodes", type=int, default=40, help="most mentioned entities kept in the network")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    entities, counts = comention_counts(article_mask(args.media, args.topics, *args.years))
+    nodes, edges = prune_network(entities, counts, args.nodes)
+    print(f"{len(get_vocabulary())} entities in the vocabulary, {len(nodes)} nodes and {len(edges)} edges kept")
+    print(top_pairs(nodes, edges).to_string(index=False))
@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+
+from article_table import article_table
+from data_store import ARTICLE_SOURCES, file_hash
+from dataset_registry import derived
+from dedup import unique_articles
+from instrumentation import span
+
+
+# === YEAR x SEGMENT x MEDIA COUNT CUBE ===
+
+# Function to count articles per (topic, media, year, segment) in one groupby over the article table,
+# optionally counting each cluster of duplicate articles once
+def build_cube(sources: dict = ARTICLE_SOURCES, deduplicated: bool = False) -> pd.Series:
+    articles = unique_articles if deduplicated else article_table
+    table = articles(["topic", "media", "segment", "year"], sources).dropna(subset=["year"])
+    if table.empty:
+        return pd.Series(dtype="int64", name="Count")
+    # topic, media and segment are categoricals, so the cube keeps their order (segments by first appearance)
+    cube = (table.astype({"year": "int64"}).rename(columns={"year": "Year", "segment": "Segment"})
+            .groupby(["topic", "media", "Year", "Segment"], observed=True).size().rename("Count"))
+    # The topic and media levels are sliced by label and must not carry the categorical dtype
+    cube.index = cube.index.set_levels([cube.index.levels[0].astype(str), cube.index.levels[1].astype(str)],
+                                       level=[0, 1])
+    return cube.sort_index()
+
+
+# Function to return the cube, rebuilding it only when one of the source files changed
+def get_cube(sources: dict = ARTICLE_SOURCES, deduplicated: bool = False) -> pd.Series:
+    digest = tuple((path, file_hash(path)) for path in sources.values() if os.path.exists(path))
+
+    def build():
+        with span("count cube build"):
+            return build_cube(sources, deduplicated)
+
+    return derived("count cube", deduplicated, digest, build)
+
+
+# Function to slice the cube into a Year x Segment table for one topic and media
+def segment_counts(topic: str, media: str, start_year: int, end_year: int, cube: pd.Series = None,
+                   deduplicated: bool = False) -> pd.DataFrame:
+    cube = get_cube(deduplicated=deduplicated) if cube is None else cube
+    try:
+        subset = cube.xs((topic, media), level=["topic", "media"]).loc[start_year:end_year]
+    except KeyError:
+        return pd.DataFrame(dtype="int64")
+    subset.index = subset.index.remove_unused_levels()
+    table = subset.unstack("Segment", fill_value=0)
+    table.columns = table.columns.astype(str)
+    return table
+
+
+# Function to slice the cube into article counts per year for one topic and media
+def year_counts(topic: str, media: str, start_year: int, end_year: int, cube: pd.Series = None,
+                deduplicated: bool = False) -> pd.Series:
+    return segment_counts(topic, media, start_year, end_year, cube, deduplicated).sum(axis=1)
+
+
+# Function to draw pre-binned article counts per year
+def year_bar_figure(counts: pd.Series) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    figure = go.Figure(go.Bar(x=counts.index.tolist(), y=counts.tolist()))
+    figure.update_layout(xaxis_title="Year", yaxis_title="count")
+    return figure
+
+
+# Function to draw pre-binned article counts per year, stacked by segment
+def segment_bar_figure(counts: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    figure = go.Figure([go.Bar(x=counts.index.tolist(), y=counts[segment].tolist(), name=segment)
+                        for segment in counts.columns])
+    figure.update_layout(barmode="relative", xaxis_title="Year", yaxis_title="count",
+                         legend_title_text="Segment")
+    return figure
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+# === COLUMNAR SNAPSHOT STORE ===
+
+TOPICS = ["PLTS", "PLTB"]
+
+# Scraped outlets: their article file and entity count file per topic, and the column of the article files
+# behind each column of the unified article table (see article_table.py). An outlet without segments simply
+# has no "segment" entry
+OUTLETS = {
+    "Detik": {
+        "files": {"PLTS": "detik_plts_cleaned.csv", "PLTB": "detik_pltb_cleaned.csv"},
+        "counts": {"PLTS": "aggregated_counts.csv", "PLTB": "aggregated_counts_detikangin.csv"},
+        "columns": {"title": "Title", "link": "Link", "description": "Description", "text": "Article",
+                    "segment": "Segment"},
+    },
+    "CNBC": {
+        "files": {"PLTS": "cnbc_plts_merged.csv", "PLTB": "cnbc_pltb_merged.csv"},
+        "counts": {"PLTS": "aggregated_counts_cnbcplts.csv", "PLTB": "aggregated_counts_cnbcangin.csv"},
+        "columns": {"title": "title", "link": "link", "text": "content", "segment": "Segment"},
+    },
+    "Tribun": {
+        "files": {"PLTS": "tribun_plts_merged.csv", "PLTB": "tribun_pltb_merged.csv"},
+        "counts": {"PLTS": "aggregated_counts_tribunplts.csv", "PLTB": "aggregated_counts_tribunpltb.csv"},
+        "columns": {"title": "Title", "link": "Link", "description": "Description", "text": "Article"},
+    },
+}
+
+# Scraped article files used by the dashboard charts, keyed by (topic, media)
+ARTICLE_SOURCES = {(topic, media): outlet["files"][topic]
+                   for topic in TOPICS for media, outlet in OUTLETS.items() if topic in outlet["files"]}
+ARTICLE_FILES = list(ARTICLE_SOURCES.values())
+
+# The outlets name their link and body columns differently
+LINK_COLUMNS = list(dict.fromkeys(outlet["columns"]["link"] for outlet in OUTLETS.values()))
+TEXT_COLUMNS = list(dict.fromkeys(outlet["columns"]["text"] for outlet in OUTLETS.values()))
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+
+# Low-cardinality text columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = ["Segment", "News_Segment", "Day", "NER_Label"]
+
+# Publication time columns, best first: Detik's Real_Date is a UTC timestamp, CNBC and Tribun carry an ISO date
+# in Date (Detik's Date is its raw "detikNewsSenin, 17 Apr 2023 10:54 WIB" header and is never reached)
+DATE_COLUMNS = ["Real_Date", "Date"]
+# Publication times are stored as naive Jakarta (WIB) time so days and weeks break at local midnight
+LOCAL_TIMEZONE = "Asia/Jakarta"
+
+# Bump when the snapshot typing changes so existing snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+_hash_memo = {}
+
+
+# Function to compute a content hash of a source file, memoized on (size, mtime)
+def file_hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        _hash_memo[key] = digest.hexdigest()
+    return _hash_memo[key]
+
+
+def snapshot_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(SNAPSHOT_DIR, name + ".parquet")
+
+
+def _meta_path(path: str) -> str:
+    return os.path.splitext(snapshot_path(path))[0] + ".json"
+
+
+# Function to write a file under a temporary name unique to this process and thread, then move it into place:
+# readers never see a partial file, and writers racing on the same file (a session and the background warm-up)
+# never share a temporary. writer(temporary) writes the content; the temporary keeps the file's extension
+def atomic_write(path: str, writer):
+    root, extension = os.path.splitext(path)
+    temporary = f"{root}.{os.getpid()}.{threading.get_ident()}.tmp{extension}"
+    try:
+        writer(temporary)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+# Function to write a binary file with atomic_write
+def write_bytes(path: str, data: bytes):
+    def writer(temporary):
+        with open(temporary, "wb") as handle:
+            handle.write(data)
+
+    atomic_write(path, writer)
+
+
+# Function to write a JSON file with atomic_write
+def write_json(path: str, value):
+    def writer(temporary):
+        with open(temporary, "w") as handle:
+            json.dump(value, handle)
+
+    atomic_write(path, writer)
+
+
+# Function to check whether the snapshot of a CSV is missing or out of date
+def is_stale(path: str) -> bool:
+    if not os.path.exists(snapshot_path(path)) or not os.path.exists(_meta_path(path)):
+        return True
+    with open(_meta_path(path)) as handle:
+        meta = json.load(handle)
+    if meta.get("version") != SNAPSHOT_VERSION:
+        return True
+    stat = os.stat(path)
+    if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return False
+    # Touched but possibly unchanged (e.g. a fresh checkout), fall back to the content hash
+    return meta["sha256"] != file_hash(path)
+
+
+# Function to parse the first date column of a file into a datetime64 Series (NaT where missing)
+def parse_published(df: pd.DataFrame):
+    for column in DATE_COLUMNS:
+        if column not in df:
+            continue
+        published = pd.to_datetime(df[column], errors="coerce", utc=True, format="ISO8601")
+        if published.notna().any():
+            return published.dt.tz_convert(LOCAL_TIMEZONE).dt.tz_localize(None)
+    return None
+
+
+# Function to give a frame read from a CSV the snapshot's column types: nullable years and categorical labels
+def _type_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if "Year" in df:
+        df["Year"] = pd.to_numeric(df["Year"], errors="coerce").astype("Int16")
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+    return df
+
+
+# Function to convert a CSV into a typed Parquet snapshot
+def build_snapshot(path: str) -> str:
+    df = pd.read_csv(path)
+
+    published = parse_published(df)
+    if published is not None:
+        df["Published"] = published
+    _type_columns(df)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    target = snapshot_path(path)
+    atomic_write(target, lambda temporary: df.to_parquet(temporary, engine="pyarrow", index=False))
+
+    stat = os.stat(path)
+    write_json(_meta_path(path), {"version": SNAPSHOT_VERSION, "source": os.path.basename(path),
+                                  "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash(path)})
+    return target
+
+
+# Function to list the columns stored in a CSV's snapshot without reading any data
+def snapshot_columns(path: str) -> list:
+    if is_stale(path):
+        build_snapshot(path)
+    return pq.read_schema(snapshot_path(path)).names
+
+
+# Function to read the columns of a CSV that it has among the requested ones, in frames of at most batch_size
+# rows. A fresh snapshot is read batch by batch; a stale one is not rebuilt, the CSV itself is streamed with only
+# those columns parsed, so the file is never in memory as a whole
+def stream_columns(path: str, columns: list, batch_size: int):
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    stale = is_stale(path)
+    available = pd.read_csv(path, nrows=0).columns if stale else snapshot_columns(path)
+    wanted = [column for column in columns if column in available]
+    if not wanted:
+        return
+    if not stale:
+        for batch in pq.ParquetFile(snapshot_path(path)).iter_batches(batch_size=batch_size, columns=wanted):
+            yield batch.to_pandas()
+        return
+
+    reader = pv.open_csv(path, parse_options=pv.ParseOptions(newlines_in_values=True),
+                         convert_options=pv.ConvertOptions(include_columns=wanted, strings_can_be_null=True,
+                                                           column_types={column: pa.string() for column in wanted}))
+    for batch in reader:
+        for offset in range(0, batch.num_rows, batch_size):
+            yield _type_columns(batch.slice(offset, batch_size).to_pandas())
+
+
+# Function to load only the requested columns of a CSV, rebuilding its snapshot when the source changed
+def load_columns(path: str, columns=None) -> pd.DataFrame:
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    if is_stale(path):
+        build_snapshot(path)
+    return pd.read_parquet(snapshot_path(path), engine="pyarrow",
+                           columns=list(columns) if columns is not None else None)
+
+
+# Build step: python data_store.py [file.csv ...]
+if __name__ == "__main__":
+    for source in sys.argv[1:] or ARTICLE_FILES:
+        if not os.path.exists(source):
+            print(f"skip {source}: not found")
+            continue
+        if is_stale(source):
+            print(f"built {build_snapshot(source)}")
+        else:
+            print(f"up to date {snapshot_path(source)}")
@@ -0,0 +1,143 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data_store import file_hash, load_columns
+from instrumentation import count, span
+
+
+# === SHARED DATASET REGISTRY ===
+
+# Ceiling for all registered datasets and the values derived from them (article table, count cube, entity
+# indexes, timelines, co-mention matrices) together; the least recently used ones are evicted above it.
+# The other module memos hold one small entry per article or count file (hashes, keyword rows, term counts)
+MEMORY_BUDGET_BYTES = int(float(os.environ.get("MEDIA_DATASET_BUDGET_MB", "256")) * 1024 * 1024)
+
+
+# Function to mark the NumPy buffers behind a frame read-only, so a shared frame cannot be mutated in place.
+# Extension columns (nullable ints, Arrow strings) hand out copies here and are left as they are
+def _freeze(frame: pd.DataFrame) -> pd.DataFrame:
+    for column in frame.columns:
+        values = frame[column].array
+        array = values.codes if isinstance(values, pd.Categorical) else frame[column].to_numpy(copy=False)
+        while isinstance(array.base, np.ndarray):
+            array = array.base
+        array.flags.writeable = False
+    return frame
+
+
+# Function to estimate the memory held by a derived value: frames, arrays, sparse matrices, or objects
+# exposing nbytes themselves
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, "indptr"):
+        return int(value.data.nbytes + value.indices.nbytes + value.indptr.nbytes)
+    return int(getattr(value, "nbytes", 0))
+
+
+class DatasetRegistry:
+    # Process-wide store of immutable datasets, shared by every session without copies
+
+    def __init__(self, budget_bytes: int = MEMORY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.stats = {"hits": 0, "loads": 0, "builds": 0, "evictions": 0}
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # Function to return a shared read-only frame of some columns of an article or count file
+    def get(self, path: str, columns=None) -> pd.DataFrame:
+        key = (path, tuple(columns) if columns is not None else None)
+        return self._entry(key, file_hash(path), lambda: self._load(path, columns), "loads")
+
+    def _load(self, path: str, columns) -> tuple:
+        with span(f"load {os.path.basename(path)}"):
+            frame = _freeze(load_columns(path, columns))
+        size = int(frame.memory_usage(deep=True).sum())
+        count("dataset.loads")
+        count("dataset.bytes_loaded", size)
+        return frame, size
+
+    # Function to return a value derived from the datasets, built once per digest (the hashes of what it was
+    # built from) and evicted with the datasets. Callers must not mutate it
+    def derived(self, name: str, key, digest, build):
+        def built():
+            value = build()
+            return value, _nbytes(value)
+
+        return self._entry((name, key, "derived"), digest, built, "builds")
+
+    def _entry(self, key, digest, build, stat: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["digest"] == digest:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                count("dataset.hits")
+                return entry["value"]
+
+        # One builder per entry; concurrent sessions asking for it wait and then share it
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["digest"] == digest:
+                    self.stats["hits"] += 1
+                    count("dataset.hits")
+                    return entry["value"]
+
+            value, size = build()
+            with self._lock:
+                self.stats[stat] += 1
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old["bytes"]
+                self._entries[key] = {"value": value, "digest": digest, "bytes": size}
+                self._bytes += size
+                self._evict()
+            return value
+
+    def _evict(self):
+        # Drop the coldest entries, always keeping the one just added
+        while self._bytes > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["bytes"]
+            self.stats["evictions"] += 1
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    # Function to list the registered entries, coldest first, for the debug panel
+    def datasets(self) -> list:
+        with self._lock:
+            return [{"entry": key[0] if key[-1] == "derived" else os.path.basename(key[0]),
+                     "columns": None if key[-1] == "derived" else key[1], "bytes": entry["bytes"]}
+                    for key, entry in self._entries.items()]
+
+    # Function to drop the derived values (datasets stay), so the next request rebuilds them from the datasets
+    def clear_derived(self):
+        with self._lock:
+            for key in [key for key in self._entries if key[-1] == "derived"]:
+                self._bytes -= self._entries.pop(key)["bytes"]
+
+
+REGISTRY = DatasetRegistry()
+
+
+def get_dataset(path: str, columns=None) -> pd.DataFrame:
+    return REGISTRY.get(path, columns)
+
+
+def derived(name: str, key, digest, build):
+    return REGISTRY.derived(name, key, digest, build)
@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import os
+import re
+import zlib
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from article_table import article_table
+from data_store import ARTICLE_SOURCES, OUTLETS, atomic_write, file_hash, snapshot_columns, snapshot_path
+from instrumentation import span
+
+
+# === DUPLICATE AND NEAR-DUPLICATE ARTICLES ===
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "dedup")
+
+# Bump when the rules below change so stored results are recomputed
+DEDUP_VERSION = 1
+
+# Word shingles per article; articles shorter than this are only deduplicated exactly
+SHINGLE_SIZE = 5
+# MinHash signature length, split into LSH bands of BAND_ROWS rows. Articles sharing any band become candidates;
+# with 16 bands of 8 rows, pairs above ~0.7 Jaccard similarity almost always share one
+NUM_PERMUTATIONS = 128
+BAND_ROWS = 8
+# Estimated Jaccard similarity of the shingle sets above which two candidates are merged
+SIMILARITY_THRESHOLD = 0.8
+# Articles read, shingled and signed per batch; only their signatures and content hashes are kept, so memory
+# grows by NUM_PERMUTATIONS * 4 bytes per article rather than with the text
+BATCH_ARTICLES = 1000
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_dedup_memo = {}
+
+
+# Function to reduce a link to scheme-less host and path, so tracking parameters, fragments, "www." and
+# trailing slashes do not hide a duplicate
+def normalize_link(link) -> str:
+    if not isinstance(link, str) or not link.strip():
+        return ""
+    parts = urlsplit(link.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return host + parts.path.rstrip("/")
+
+
+def content_hash(tokens: list) -> str:
+    return hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest() if tokens else ""
+
+
+class _Clusters:
+    # Union-find over article positions
+
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        self.parent[max(first, second)] = min(first, second)
+        return True
+
+    def roots(self) -> np.ndarray:
+        return np.array([self.find(item) for item in range(len(self.parent))])
+
+
+# Function to hash every word shingle of every article in one array, with the article each belongs to
+def shingle_hashes(token_hashes: list) -> tuple:
+    lengths = np.array([len(tokens) for tokens in token_hashes])
+    if not lengths.sum():
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    flat = np.concatenate([np.asarray(tokens, dtype=np.uint64) for tokens in token_hashes])
+    owners = np.repeat(np.arange(len(token_hashes)), lengths)
+
+    # Polynomial rolling hash over SHINGLE_SIZE consecutive tokens (uint64 arithmetic wraps around)
+    windows = len(flat) - SHINGLE_SIZE + 1
+    if windows <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    shingles = np.zeros(windows, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(SHINGLE_SIZE):
+            shingles = shingles * np.uint64(1_000_003) + flat[offset:offset + windows]
+    # Keep the windows that do not run into the next article
+    valid = owners[:windows] == owners[SHINGLE_SIZE - 1:]
+    return shingles[valid], owners[:windows][valid]
+
+
+# Function to compute MinHash signatures (rows: articles, columns: permutations); articles without shingles
+# get an all-max signature and are excluded from the candidate search
+def minhash_signatures(shingles: np.ndarray, owners: np.ndarray, count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hash family: (a * x + b) >> 32 with odd a
+    multipliers = rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+    offsets = rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+    signatures = np.full((count, NUM_PERMUTATIONS), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if not len(shingles):
+        return signatures
+
+    # owners is sorted, so each article's shingles are one run
+    firsts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    with np.errstate(over="ignore"):
+        for permutation in range(NUM_PERMUTATIONS):
+            hashed = ((shingles * multipliers[permutation] + offsets[permutation]) >> np.uint64(32)).astype(np.uint32)
+            signatures[owners[firsts], permutation] = np.minimum.reduceat(hashed, firsts)
+    return signatures
+
+
+# Function to stream the article bodies in article table order, BATCH_ARTICLES at a time, straight from the
+# snapshots (an outlet without a text column yields empty bodies)
+def article_texts(sources: dict = ARTICLE_SOURCES, batch_size: int = BATCH_ARTICLES):
+    import pyarrow.parquet as pq
+
+    for (_, media), path in sources.items():
+        if not os.path.exists(path):
+            continue
+        text_column = OUTLETS[media]["columns"].get("text")
+        # Listing the columns rebuilds a stale snapshot first
+        columns = snapshot_columns(path)
+        snapshot = pq.ParquetFile(snapshot_path(path))
+        if text_column not in columns:
+            rows = snapshot.metadata.num_rows
+            for start in range(0, rows, batch_size):
+                yield [None] * min(batch_size, rows - start)
+            continue
+        for batch in snapshot.iter_batches(batch_size=batch_size, columns=[text_column]):
+            yield batch.column(0).to_pylist()
+
+
+# Function to find candidate pairs with LSH banding and keep those whose signatures agree enough.
+# Each bucket is compared against its first member only, so a large bucket costs linear time
+def near_duplicate_pairs(signatures: np.ndarray, groups: np.ndarray, eligible: np.ndarray) -> list:
+    candidates = np.flatnonzero(eligible)
+    pairs = set()
+    for band in range(NUM_PERMUTATIONS // BAND_ROWS):
+        # Bucket key: the article's group (topic) and the band's rows, hashed to one integer
+        keys = groups[candidates].astype(np.uint64)
+        with np.errstate(over="ignore"):
+            for column in range(band * BAND_ROWS, (band + 1) * BAND_ROWS):
+                keys = keys * np.uint64(0x100000001B3) + signatures[candidates, column].astype(np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        heads = order[np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))][~starts]
+        members = order[~starts]
+        if not len(members):
+            continue
+        first, second = candidates[heads], candidates[members]
+        similarity = (signatures[first] == signatures[second]).mean(axis=1)
+        close = similarity >= SIMILARITY_THRESHOLD
+        pairs.update(zip(first[close].tolist(), second[close].tolist()))
+    return sorted(pairs)
+
+
+# Function to cluster duplicate articles of the article table. Returns one row per article, in table order, with
+# the table position of the article its cluster keeps, whether it is a duplicate and how it matched.
+# Bodies are streamed in batches and dropped once hashed and signed
+def find_duplicates(sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    table = article_table(["topic", "media", "link", "published"], sources)
+    count = len(table)
+    clusters = _Clusters(count)
+    reasons = np.full(count, "", dtype=object)
+    groups = table["topic"].cat.codes.to_numpy().astype(np.int64)
+
+    def match(first: int, second: int, reason: str):
+        clusters.union(first, second)
+        reasons[first] = reasons[first] or reason
+        reasons[second] = reasons[second] or reason
+
+    # Per article, only its content hash and MinHash signature outlive the batch it was read in
+    contents = np.full(count, "", dtype=object)
+    signatures = np.full((count, NUM_PERMUTATIONS), np.iinfo(np.uint32).max, dtype=np.uint32)
+    eligible = np.zeros(count, dtype=bool)
+    start = 0
+    with span("dedup minhash"):
+        for texts in article_texts(sources):
+            tokens = [TOKEN_PATTERN.findall(text.casefold()) if isinstance(text, str) else [] for text in texts]
+            stop = start + len(tokens)
+            contents[start:stop] = [content_hash(article) for article in tokens]
+            shingles, owners = shingle_hashes([[zlib.crc32(token.encode("utf-8")) for token in article]
+                                               for article in tokens])
+            signatures[start:stop] = minhash_signatures(shingles, owners, len(tokens))
+            eligible[start:stop] = np.bincount(owners, minlength=len(tokens)) > 0
+            start = stop
+
+    # Exact duplicates within a topic: the same normalized link, or the same body word for word
+    exact = pd.DataFrame({"group": groups,
+                          "link": [normalize_link(link) for link in table["link"]],
+                          "content": contents})
+    for column in ("link", "content"):
+        keyed = exact[exact[column] != ""]
+        heads = keyed.index.to_series().groupby([keyed["group"], keyed[column]], sort=False).transform("first")
+        for position, head in heads[heads.index != heads].items():
+            match(int(head), int(position), column)
+
+    # Near duplicates: candidates found by LSH banding over the signatures
+    for first, second in near_duplicate_pairs(signatures, groups, eligible):
+        match(first, second, "near")
+
+    # Keep the earliest published article of each cluster (the first in table order on ties or missing dates)
+    roots = clusters.roots()
+    stamps = table["published"].to_numpy(dtype="datetime64[ns]")
+    published = np.where(np.isnat(stamps), np.iinfo(np.int64).max, stamps.astype(np.int64))
+    kept = {}
+    for position in np.lexsort((np.arange(count), published, roots)):
+        kept.setdefault(roots[position], position)
+    cluster = np.array([kept[root] for root in roots], dtype=np.int64)
+    duplicate = cluster != np.arange(count)
+
+    return pd.DataFrame({
+        "topic": table["topic"].to_numpy(),
+        "media": table["media"].to_numpy(),
+        "row": table.groupby(["topic", "media"], observed=True, sort=False).cumcount().to_numpy(),
+        "cluster": cluster,
+        "duplicate": duplicate,
+        "reason": np.where(duplicate, reasons, ""),
+    })
+
+
+def _results_path(digest: str) -> str:
+    return os.path.join(RESULTS_DIR, digest + ".parquet")
+
+
+# Function to identify one state of the article files; an article's duplicates may sit in another outlet's file
+def dedup_key(sources: dict = ARTICLE_SOURCES) -> str:
+    parts = [f"v{DEDUP_VERSION}"] + [f"{topic}|{media}|{file_hash(path)}"
+                                     for (topic, media), path in sources.items() if os.path.exists(path)]
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+# Function to return the duplicate clusters, recomputed only when an article file changes
+def get_duplicates(sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    digest = dedup_key(sources)
+    cached = _dedup_memo.get(digest)
+    if cached is not None:
+        return cached
+
+    path = _results_path(digest)
+    if os.path.exists(path):
+        duplicates = pd.read_parquet(path)
+    else:
+        with span("dedup"):
+            duplicates = find_duplicates(sources)
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        atomic_write(path, lambda temporary: duplicates.to_parquet(temporary, engine="pyarrow", index=False))
+    _dedup_memo.clear()
+    _dedup_memo[digest] = duplicates
+    return duplicates
+
+
+# Function to return, for one article file, which of its rows are duplicates of an article kept elsewhere
+def duplicate_rows(topic: str, media: str, sources: dict = ARTICLE_SOURCES) -> np.ndarray:
+    duplicates = get_duplicates(sources)
+    rows = duplicates[(duplicates["topic"] == topic) & (duplicates["media"] == media)]
+    return rows.sort_values("row")["duplicate"].to_numpy()
+
+
+# Function to return the article table without the duplicates, keeping one article per cluster
+def unique_articles(columns: list = None, sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    table = article_table(columns, sources)
+    return table[~get_duplicates(sources)["duplicate"].to_numpy()]
+
+
+# Function to summarize how many articles each rule removes, per topic and media
+def dedup_report(sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    duplicates = get_duplicates(sources)
+    report = pd.crosstab([duplicates["topic"], duplicates["media"]], duplicates["reason"])
+    report = report.rename(columns={"": "kept", "link": "same link", "content": "same body", "near": "near duplicate"})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster duplicate and near-duplicate articles.")
+    parser.add_argument("--clusters", action="store_true", help="also print every cluster with more than one article")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    print(dedup_report().to_string())
+    if args.clusters:
+        duplicates = get_duplicates()
+        table = article_table(["topic", "media", "title", "published"])
+        clustered = duplicates[duplicates.groupby("cluster")["cluster"].transform("size") > 1]
+        for cluster, members in clustered.groupby("cluster"):
+            print()
+            for position, member in members.iterrows():
+                article = table.iloc[position]
+                print(f"{'kept' if position == cluster else member['reason']:>8}  {article['media']:<7}"
+                      f"{article['published']!s:<21}{article['title']}")
@@ -0,0 +1,114 @@
+import bisect
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_store import OUTLETS, TOPICS, file_hash
+from dataset_registry import derived, get_dataset
+from entity_normalize import normalization_id, normalize_counts
+from instrumentation import span
+
+
+# === ENTITY RANKING INDEX ===
+
+# Sidebar entity types mapped to the NER labels in the count files
+ENTITY_LABELS = {'Individuals': 'B-PER', 'Organizations': 'B-ORG'}
+
+# Entity count files per corpus: the overall ones, then one per outlet and topic (see data_store.OUTLETS)
+COUNT_FILES = {
+    'Overall PLTS': 'corpus_cleaned.csv',
+    'Overall PLTB': 'pltb_wordcloud.csv',
+    **{f'{media} {topic}': outlet['counts'][topic]
+       for topic in TOPICS for media, outlet in OUTLETS.items() if topic in outlet.get('counts', {})},
+}
+
+class EntityIndex:
+    # Entities and counts per NER label, pre-sorted by descending count so top N is a slice. Names are stored
+    # once, in a table shared by the labels; each label keeps codes into it and its ranks in alphabetical order
+
+    def __init__(self, counts: pd.DataFrame, min_count: int = 1, report: dict = None):
+        # Normalization report of the counts, when they went through entity_normalize
+        self.report = report or {}
+        counts = counts.dropna(subset=['Entity'])
+        grouped = counts.groupby(['NER_Label', 'Entity'], observed=True)['Counts'].sum().reset_index()
+        grouped = grouped[grouped['Counts'] >= min_count]
+
+        codes, names = pd.factorize(grouped['Entity'])
+        self._table = np.asarray(names, dtype=object)
+        self._codes = {}
+        self._counts = {}
+        self._lookup = {}
+        for label, positions in grouped.groupby('NER_Label').indices.items():
+            values = grouped['Counts'].to_numpy(dtype=np.int64)[positions]
+            # Stable sort keeps ties in alphabetical order
+            order = np.argsort(-values, kind='stable')
+            self._codes[label] = codes[positions][order].astype(np.int32)
+            self._counts[label] = values[order]
+
+            # Ranks ordered by casefolded name, for binary search without a second copy of the names
+            keys = [name.lower() for name in self._table[self._codes[label]]]
+            self._lookup[label] = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int32) + 1
+        self._bytes = (self._table.nbytes + sum(sys.getsizeof(name) for name in self._table)
+                       + sum(array.nbytes for table in (self._codes, self._counts, self._lookup)
+                             for array in table.values()))
+
+    @property
+    def labels(self) -> list:
+        return list(self._codes)
+
+    # Memory held by the index, for the dataset registry's budget
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def size(self, label: str) -> int:
+        return len(self._codes.get(label, ()))
+
+    def _names(self, label: str, ranks) -> np.ndarray:
+        return self._table[self._codes[label][np.asarray(ranks) - 1]]
+
+    # Function to return the first position in a label's lookup whose casefolded name is not below key
+    def _search(self, label: str, key: str) -> int:
+        table, codes = self._table, self._codes[label]
+        return bisect.bisect_left(self._lookup[label], key, key=lambda rank: table[codes[rank - 1]].lower())
+
+    # Function to return the top N entities of a label as {entity: count}
+    def top_n(self, label: str, n: int) -> dict:
+        if label not in self._codes:
+            return {}
+        return dict(zip(self._table[self._codes[label][:n]].tolist(), self._counts[label][:n].tolist()))
+
+    # Function to return the 1-based rank of an entity (case-insensitive), or None if it is not indexed
+    def rank(self, label: str, entity: str):
+        if label not in self._lookup:
+            return None
+        lookup = self._lookup[label]
+        position = self._search(label, entity.lower())
+        if position < len(lookup) and self._names(label, lookup[position]).lower() == entity.lower():
+            return int(lookup[position])
+        return None
+
+    # Function to find entities starting with a prefix (case-insensitive), best ranked first
+    def prefix(self, label: str, prefix: str, limit: int = 20) -> pd.DataFrame:
+        columns = ['Rank', 'Entity', 'Counts']
+        if label not in self._lookup:
+            return pd.DataFrame(columns=columns)
+        start = self._search(label, prefix.lower())
+        stop = self._search(label, prefix.lower() + '\U0010ffff')
+        ranks = np.sort(self._lookup[label][start:stop])[:limit]
+        return pd.DataFrame({'Rank': ranks,
+                             'Entity': self._names(label, ranks),
+                             'Counts': self._counts[label][ranks - 1]}, columns=columns)
+
+
+# Function to build the index of a normalized count file once, rebuilding only when the file or aliases change
+def get_index(path: str, min_count: int = 1) -> EntityIndex:
+    def build():
+        dataset = get_dataset(path)
+        with span(f"normalize {path}"):
+            counts, report = normalize_counts(dataset)
+        with span(f"entity index {path}"):
+            return EntityIndex(counts, min_count, report)
+
+    return derived("entity index", (path, min_count), (file_hash(path), normalization_id()), build)
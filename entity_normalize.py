@@ -0,0 +1,119 @@
+import os
+
+import pandas as pd
+
+from data_store import file_hash
+
+
+# === ENTITY NORMALIZATION ===
+
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entity_aliases.csv")
+
+# Bump when the rules below change so cached indexes and renders are rebuilt
+NORMALIZE_VERSION = 2
+
+# Tokens tagged as entities that are really phone numbers, dates, money, percentages, handles or model padding
+NOISE_PATTERNS = [
+    r"\d{6,}",
+    r"\d{1,2}/\d{1,2}/\d{2,4}",
+    r"^(?:rp|us\$|usd|\$)\s*\d",
+    r"^\d[\d\s.,]*(?:ribu|juta|miliar|triliun)\b",
+    r"\d\s*(?:persen|%)",
+    r"^@",
+    r"\[(?:pad|unk|cls|sep|mask)\]",
+]
+
+
+def load_aliases(path: str = ALIASES_FILE) -> dict:
+    if not os.path.exists(path):
+        return {}
+    aliases = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return dict(zip(normalize_text(aliases["Alias"]), normalize_text(aliases["Entity"])))
+
+
+# Function to identify the normalization rules and alias table in use, for cache keys
+def normalization_id() -> str:
+    aliases = file_hash(ALIASES_FILE)[:12] if os.path.exists(ALIASES_FILE) else "none"
+    return f"v{NORMALIZE_VERSION}-{aliases}"
+
+
+# Function to strip punctuation and extra whitespace from a Series of names, keeping their case
+def clean_text(names: pd.Series) -> pd.Series:
+    return (names.astype(str)
+            .str.replace(r"[^\w\s&-]|_", " ", regex=True)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip())
+
+
+# Function to casefold and strip punctuation from a Series of names
+def normalize_text(names: pd.Series) -> pd.Series:
+    return clean_text(names.astype(str).str.casefold())
+
+
+# Function to map raw entity names to their canonical form, or NaN for noise tokens
+def normalize_entities(names: pd.Series, aliases: dict) -> pd.Series:
+    raw = names.astype(str).str.casefold().str.strip()
+    noise = raw.str.contains("|".join(NOISE_PATTERNS), regex=True)
+
+    text = normalize_text(raw)
+    # Anything without two consecutive letters ($, 00, 000, "t") is not a name
+    noise |= ~text.str.contains(r"[^\W\d_]{2}", regex=True)
+
+    canonical = text.map(aliases).fillna(text)
+    return canonical.mask(noise)
+
+
+# Function to normalize a NER_Label,Entity,Counts frame into interned categoricals. Variants are merged on
+# their canonical (casefolded) form and shown as their most frequent original spelling.
+# Returns the merged counts and a report on how much the vocabulary shrank
+def normalize_counts(counts: pd.DataFrame, aliases: dict = None) -> tuple:
+    aliases = load_aliases() if aliases is None else aliases
+    counts = counts.dropna(subset=["Entity"])
+
+    # Normalize each distinct name once and remap the codes
+    raw = pd.Categorical(counts["Entity"].astype(str))
+    names = pd.Series(raw.categories)
+    cleaned = normalize_entities(names, aliases)
+    entities = pd.Series(cleaned.to_numpy()[raw.codes], index=counts.index)
+    surfaces = pd.Series(clean_text(names).to_numpy()[raw.codes], index=counts.index)
+
+    kept = entities.notna()
+    variants = pd.DataFrame({
+        "NER_Label": counts["NER_Label"][kept].astype("category"),
+        "Key": entities[kept].astype("category"),
+        "Entity": surfaces[kept].astype("category"),
+        "Counts": counts["Counts"][kept],
+    })
+    variants = variants.groupby(["NER_Label", "Key", "Entity"], observed=True)["Counts"].sum().reset_index()
+    # Most frequent spelling of each canonical entity (ties go to the first in sort order)
+    shown = (variants.sort_values("Counts", ascending=False, kind="stable")
+             .drop_duplicates(["NER_Label", "Key"]).set_index(["NER_Label", "Key"])["Entity"])
+    normalized = variants.groupby(["NER_Label", "Key"], observed=True)["Counts"].sum().astype("int32").reset_index()
+    normalized["Entity"] = shown.reindex(pd.MultiIndex.from_frame(normalized[["NER_Label", "Key"]])).to_numpy()
+    normalized = normalized[["NER_Label", "Entity", "Counts"]].astype({"Entity": "category"})
+
+    before = counts.drop_duplicates(["NER_Label", "Entity"]).shape[0]
+    noise = counts[~kept].drop_duplicates(["NER_Label", "Entity"]).shape[0]
+    after = len(normalized)
+    report = {
+        "entities_before": before,
+        "entities_after": after,
+        "noise_removed": noise,
+        "variants_merged": before - noise - after,
+        "mentions_removed": int(counts.loc[~kept, "Counts"].sum()),
+        "shrink_percent": round(100 * (before - after) / before, 1) if before else 0.0,
+    }
+    return normalized, report
+
+
+# Vocabulary report: python entity_normalize.py [counts.csv ...]
+if __name__ == "__main__":
+    import sys
+
+    from entity_index import COUNT_FILES
+
+    for path in sys.argv[1:] or sorted(set(COUNT_FILES.values())):
+        _, report = normalize_counts(pd.read_csv(path))
+        print(f"{path}: {report['entities_before']} -> {report['entities_after']} entities "
+              f"({report['shrink_percent']}% smaller, {report['noise_removed']} noise, "
+              f"{report['variants_merged']} merged variants)")
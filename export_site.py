@@ -0,0 +1,160 @@
+import argparse
+import html
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from artifacts import ARTIFACTS_DIR, SITE_DIR, read_artifact, save_artifact
+from sections import SECTIONS
+
+
+# === STATIC PRE-RENDER / EXPORT ===
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MediaAnalysis.py")
+
+# Widget values to pre-render, by widget key; widgets not listed are rendered at their default value only
+GRID_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "export_grid.json")
+
+# Sections rendered in the process pool (word cloud layout is the CPU-bound part of the dashboard)
+POOLED_PREFIX = "Word Cloud: "
+
+# plotly.js is copied next to index.html from the installed plotly package, so the site works offline
+PLOTLY_JS = "plotly.min.js"
+
+
+# Function to run the dashboard once so every section registers itself; returns the widget defaults by key
+def load_app(timeout: float = 600) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    # The script runs as __main__; put this module back so the process pool can pickle its functions
+    main = sys.modules["__main__"]
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    finally:
+        sys.modules["__main__"] = main
+    if app.exception:
+        raise RuntimeError(f"MediaAnalysis.py raised: {app.exception[0].value}")
+    inputs = {name for unit in SECTIONS.values() for name in unit.inputs}
+    return {name: app.session_state[name] for name in inputs if name in app.session_state}
+
+
+def load_grid(path: str = GRID_FILE) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return {key: list(values) for key, values in json.load(handle).items() if not key.startswith("_")}
+
+
+# Function to list the widget value combinations to render for a section, the default combination first
+def combinations(unit, defaults: dict, grid: dict) -> list:
+    choices = []
+    for name in unit.inputs:
+        default = defaults[name]
+        choices.append([default] + [value for value in grid.get(name, []) if value != default])
+    return [dict(zip(unit.inputs, values)) for values in itertools.product(*choices)]
+
+
+def _init_worker():
+    # Forked workers inherit the registered sections; spawned ones run the dashboard once themselves
+    if not SECTIONS:
+        load_app()
+
+
+def _compute(name: str, state: dict):
+    unit = SECTIONS[name]
+    return unit.compute(*(state[input_name] for input_name in unit.inputs))
+
+
+# Function to render every section for every combination of the grid into directory (artifacts only).
+# Returns {section name: [(state, artifact key), ...]}
+def export_artifacts(defaults: dict, grid: dict, directory: str = ARTIFACTS_DIR, workers: int = None) -> dict:
+    rendered = {name: [] for name in SECTIONS}
+    pooled, serial = [], []
+    for name, unit in SECTIONS.items():
+        for state in combinations(unit, defaults, grid):
+            key = unit.key(state)
+            rendered[name].append((state, key))
+            (pooled if name.startswith(POOLED_PREFIX) else serial).append((name, state, key))
+
+    written = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [(key, pool.submit(_compute, name, state)) for name, state, key in pooled]
+        # Charts are cheap once the article table is loaded, so they run here while the pool lays out word clouds
+        for name, state, key in serial:
+            written.update(save_artifact(key, _compute(name, state), directory))
+        for key, future in futures:
+            written.update(save_artifact(key, future.result(), directory))
+
+    # Artifacts of earlier exports (older data, code or grid) are never served again
+    for filename in os.listdir(directory):
+        if filename not in written:
+            os.remove(os.path.join(directory, filename))
+    return rendered
+
+
+def _render_outputs(outputs, index: list) -> str:
+    if outputs is None:
+        return ""
+    if "tuple" in outputs:
+        return "".join(_render_outputs(item, index) for item in outputs["tuple"])
+    if "png" in outputs:
+        return f'<img src="artifacts/{outputs["png"]}" alt="word cloud">'
+    if "table" in outputs:
+        table = outputs["table"]
+        header = "".join(f"<th>{html.escape(str(column))}</th>" for column in table["columns"])
+        rows = "".join("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>"
+                       for row in table["data"])
+        return f"<table><tr>{header}</tr>{rows}</table>"
+    index[0] += 1
+    chart = f"chart-{index[0]}"
+    # Figure text (titles, hover labels) may contain "</script>", which would end the script element early
+    figure = json.dumps(outputs["figure"]).replace("</", "<\\/")
+    return (f'<div id="{chart}"></div><script>(function () {{ var figure = {figure};'
+            f' Plotly.newPlot("{chart}", figure.data, figure.layout); }})();</script>')
+
+
+# Function to write index.html: every section, its default view open and the other combinations folded
+def write_site(rendered: dict, directory: str = SITE_DIR):
+    from plotly.offline import get_plotlyjs
+
+    with open(os.path.join(directory, PLOTLY_JS), "w", encoding="utf-8") as handle:
+        handle.write(get_plotlyjs())
+    index = [0]
+    parts = []
+    for name, combos in rendered.items():
+        parts.append(f"<h2>{html.escape(name)}</h2>")
+        for position, (state, key) in enumerate(combos):
+            stored = read_artifact(key, os.path.join(directory, "artifacts"))
+            label = ", ".join(f"{input_name} = {value}" for input_name, value in state.items()) or "default"
+            opened = " open" if position == 0 else ""
+            parts.append(f"<details{opened}><summary>{html.escape(label)}</summary>"
+                         f"{_render_outputs(stored['outputs'], index)}</details>")
+    page = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>PLTS &amp; PLTB Coverage in Indonesia</title>'
+            f'<script src="{PLOTLY_JS}"></script><style>body {{ font-family: sans-serif; margin: 2em; }} '
+            f'img {{ max-width: 100%; }} td, th {{ padding: 0 1em; text-align: left; }}</style></head><body>'
+            f'<h1>PLTS &amp; PLTB Coverage in Indonesia</h1><p>Pre-rendered {time.strftime("%Y-%m-%d %H:%M")}.</p>'
+            + "".join(parts) + "</body></html>")
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as handle:
+        handle.write(page)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render every dashboard section for a grid of widget values.")
+    parser.add_argument("--grid", default=GRID_FILE, help="JSON file of widget key -> values to render")
+    parser.add_argument("--output", default=SITE_DIR,
+                        help="site directory; the dashboard reads artifacts from MEDIA_SITE_DIR (default ./site)")
+    parser.add_argument("--workers", type=int, default=None, help="word cloud processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    defaults = load_app()
+    grid = load_grid(args.grid)
+    os.makedirs(os.path.join(args.output, "artifacts"), exist_ok=True)
+    rendered = export_artifacts(defaults, grid, os.path.join(args.output, "artifacts"), args.workers)
+    write_site(rendered, args.output)
+    total = sum(len(combos) for combos in rendered.values())
+    print(f"Rendered {total} views of {len(rendered)} sections to {args.output} in {time.perf_counter() - started:.1f} s")
@@ -0,0 +1,98 @@
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmark import DEFAULT_THRESHOLD, regressions
+
+
+# === IMPORT-TIME REPORT ===
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MediaAnalysis.py")
+
+# Last accepted report; compared against on every run so a slower time-to-first-paint shows up in review
+REPORT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "importtime_report.json")
+
+# Import times vary more between interpreters than stage timings, so only larger slowdowns count
+MIN_REGRESSION_SECONDS = 0.02
+
+
+# Function to list the import statements MediaAnalysis.py runs before its first line of output
+# (module level only: imports inside functions are paid on first use)
+def startup_imports(path: str = APP_PATH) -> list:
+    with open(path, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _importtime(code: str) -> str:
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=os.path.dirname(APP_PATH), capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return process.stderr
+
+
+# Function to run the imports in a fresh interpreter under -X importtime. Returns the cumulative seconds of each
+# module imported at the top level, in import order, leaving out what the interpreter imports on its own
+def import_times(statements: list) -> dict:
+    startup = set(_parse(_importtime("pass")))
+    return {name: seconds for name, seconds in _parse(_importtime("\n".join(statements))).items()
+            if name not in startup}
+
+
+def _parse(output: str) -> dict:
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        if name.startswith("  "):
+            continue
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+# Function to measure startup several times and keep the fastest run, as timer and disk noise only add time
+def measure_startup(repeat: int = 5) -> dict:
+    statements = startup_imports()
+    runs = [import_times(statements) for _ in range(repeat)]
+    best = min(runs, key=lambda times: sum(times.values()))
+    return {"total": round(sum(best.values()), 6), **{name: round(seconds, 6) for name, seconds in best.items()}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the import time MediaAnalysis.py pays before it renders.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to measure (fastest is kept)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before an import counts as regressed (0.5 = 50%%)")
+    parser.add_argument("--report", default=REPORT_FILE, help="stored report JSON file")
+    parser.add_argument("--update", action="store_true", help="store this run as the new report")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    results = measure_startup(args.repeat)
+    for name, seconds in sorted(results.items(), key=lambda item: -item[1]):
+        print(f"{name:40s} {seconds * 1000:10.1f} ms")
+
+    if args.update:
+        report = {"python": platform.python_version(), "statements": startup_imports(), "seconds": results}
+        with open(args.report, "w") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        print(f"report written to {args.report}")
+        sys.exit(0)
+
+    if not os.path.exists(args.report):
+        print(f"no report at {args.report}; run with --update first")
+        sys.exit(0)
+    with open(args.report) as handle:
+        slower = regressions(results, json.load(handle)["seconds"], args.threshold, MIN_REGRESSION_SECONDS)
+    for regression in slower:
+        print(f"REGRESSION {regression['stage']}: {regression['baseline'] * 1000:.1f} ms -> "
+              f"{regression['current'] * 1000:.1f} ms ({regression['ratio']}x)")
+    sys.exit(1 if slower else 0)
@@ -0,0 +1,236 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# === HOT-PATH INSTRUMENTATION ===
+
+# Record spans for every rerun, not just the sessions that open the debug panel
+ALWAYS_ENABLED = os.environ.get("MEDIA_INSTRUMENTATION", "") not in ("", "0")
+# Append one JSON line per instrumented rerun to this file
+LOG_FILE = os.environ.get("MEDIA_METRICS_LOG")
+# Serve Prometheus text on http://<host>:<port>/metrics; local only unless MEDIA_METRICS_HOST says otherwise
+# (e.g. 0.0.0.0 for a scraper on another machine)
+METRICS_PORT = os.environ.get("MEDIA_METRICS_PORT")
+METRICS_HOST = os.environ.get("MEDIA_METRICS_HOST", "127.0.0.1")
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles")
+
+_local = threading.local()
+_lock = threading.Lock()
+# Process-wide aggregates: span name -> {"count", "seconds", "max"}; counter name -> value
+_spans = defaultdict(lambda: {"count": 0, "seconds": 0.0, "max": 0.0})
+_counters = defaultdict(float)
+# Other modules' stats functions (cache hits and misses, memory), exported alongside the spans
+_collectors = {}
+_server = {}
+# The one cProfile capture allowed per process, and the thread running it
+_profiling = {}
+
+
+class _NullSpan:
+    # Shared no-op span handed out when instrumentation is off for this rerun
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, trace: list, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        # Nesting depth, so spans inside a section or cube build can be shown under it
+        self.depth = _local.depth
+        _local.depth += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        _local.depth = self.depth
+        self.trace.append((self.name, seconds, self.depth))
+        with _lock:
+            aggregate = _spans[self.name]
+            aggregate["count"] += 1
+            aggregate["seconds"] += seconds
+            aggregate["max"] = max(aggregate["max"], seconds)
+        return False
+
+
+def enabled() -> bool:
+    return getattr(_local, "trace", None) is not None
+
+
+# Function to time a block of the current rerun; a shared no-op when instrumentation is off
+def span(name: str):
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+# Function to add to a counter (cache hits, payload bytes, ...) when instrumentation is on
+def count(name: str, value: float = 1):
+    if getattr(_local, "trace", None) is None:
+        return
+    _local.counters[name] += value
+    with _lock:
+        _counters[name] += value
+
+
+def register_collector(name: str, stats):
+    _collectors[name] = stats
+
+
+# Function to start recording spans for the rerun running on this thread
+def begin_rerun(enable: bool = False):
+    if enable or ALWAYS_ENABLED or LOG_FILE:
+        _local.trace = []
+        _local.counters = defaultdict(float)
+        _local.depth = 0
+        _local.started = time.perf_counter()
+    else:
+        _local.trace = None
+
+
+# Function to stop recording, returning this rerun's spans and counters (None when it was not instrumented)
+def end_rerun(session: str = None):
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    rerun = {
+        "time": round(time.time(), 3),
+        "session": session,
+        "total_ms": round((time.perf_counter() - _local.started) * 1000, 3),
+        # Spans in the order they finished; depth 0 spans do not overlap
+        "spans": [{"name": name, "ms": round(seconds * 1000, 3), "depth": depth} for name, seconds, depth in trace],
+        "counters": dict(_local.counters),
+    }
+    _local.trace = None
+    if LOG_FILE:
+        line = json.dumps(rerun)
+        with _lock, open(LOG_FILE, "a") as handle:
+            handle.write(line + "\n")
+    return rerun
+
+
+# Function to return the process-wide span aggregates, counters and collector stats
+def snapshot() -> dict:
+    with _lock:
+        spans = {name: dict(aggregate) for name, aggregate in _spans.items()}
+        counters = dict(_counters)
+    collected = {}
+    for name, stats in _collectors.items():
+        collected[name] = {key: value for key, value in stats().items() if isinstance(value, (int, float))}
+    return {"spans": spans, "counters": counters, "collectors": collected}
+
+
+def _metric_name(name: str) -> str:
+    return "".join(character if character.isalnum() else "_" for character in name).strip("_").lower()
+
+
+# Function to render the snapshot in the Prometheus text exposition format
+def prometheus_text() -> str:
+    state = snapshot()
+    lines = [
+        "# TYPE media_span_seconds_total counter",
+        "# TYPE media_span_calls_total counter",
+        "# TYPE media_span_max_seconds gauge",
+    ]
+    for name, aggregate in sorted(state["spans"].items()):
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'media_span_seconds_total{{span="{label}"}} {aggregate["seconds"]:.6f}')
+        lines.append(f'media_span_calls_total{{span="{label}"}} {aggregate["count"]}')
+        lines.append(f'media_span_max_seconds{{span="{label}"}} {aggregate["max"]:.6f}')
+    for name, value in sorted(state["counters"].items()):
+        lines.append(f"media_{_metric_name(name)}_total {value:g}")
+    for collector, stats in sorted(state["collectors"].items()):
+        for key, value in sorted(stats.items()):
+            lines.append(f"media_{_metric_name(collector)}_{_metric_name(key)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body, content_type = prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+        elif self.path.split("?")[0] == "/metrics.json":
+            body, content_type = json.dumps(snapshot()).encode("utf-8"), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Function to start the metrics endpoint once per process, when MEDIA_METRICS_PORT is set
+def serve_metrics(port=METRICS_PORT, host: str = METRICS_HOST):
+    if not port:
+        return None
+    with _lock:
+        if "server" not in _server:
+            server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="media-metrics", daemon=True).start()
+            _server["server"] = server
+        return _server["server"]
+
+
+# === RERUN PROFILING ===
+
+# Function to start a cProfile capture of the current rerun, or return None if another one is running
+def start_profile():
+    current = threading.current_thread()
+    with _lock:
+        owner = _profiling.get("thread")
+        # Another session's rerun is being profiled
+        if owner is not None and owner is not current and owner.is_alive():
+            return None
+        # A capture left behind by a rerun of this thread that raised before stop_profile is dropped
+        if owner is current:
+            _profiling["profiler"].disable()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. an outer cProfile run) already owns the hook
+            _profiling.clear()
+            return None
+        _profiling.update(profiler=profiler, thread=current)
+    return profiler
+
+
+# Function to stop a capture, save it as a .prof file (for snakeviz, flameprof or gprof2dot)
+# and return its path with a text summary of the hottest functions
+def stop_profile(profiler, limit: int = 25) -> tuple:
+    profiler.disable()
+    with _lock:
+        if _profiling.get("profiler") is profiler:
+            _profiling.clear()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, time.strftime("rerun-%Y%m%d-%H%M%S") + f"-{threading.get_ident()}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(limit)
+    return path, summary.getvalue()
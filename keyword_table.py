@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from data_store import (ARTICLE_SOURCES, LINK_COLUMNS, OUTLETS, TEXT_COLUMNS, file_hash, load_columns,
+                        snapshot_columns, write_json)
+from dataset_registry import get_dataset
+from instrumentation import span
+
+
+# === KEYWORD x MEDIA TABLE ===
+
+# Search keywords, in the order they are plotted; add a row to track a new keyword
+KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.csv")
+
+MATCHES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "keywords")
+
+# Bump when the matching rules change so stored matches are recomputed
+MATCHER_VERSION = 2
+
+_matches_memo = {}
+
+
+def load_keywords(path: str = KEYWORDS_FILE) -> list:
+    keywords = pd.read_csv(path, dtype=str, keep_default_na=False)["Keyword"].str.strip()
+    return list(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+
+# Function to casefold and collapse whitespace, so "PLTS  Terapung" in an article matches "PLTS Terapung"
+def normalize_text(texts: pd.Series) -> pd.Series:
+    return texts.fillna("").astype(str).str.casefold().str.replace(r"\s+", " ", regex=True)
+
+
+class KeywordMatcher:
+    # Aho-Corasick automaton over all keywords: one pass over a text finds every keyword in it, overlapping
+    # ones included ("PLTS" inside "PLTS Terapung Cirata"). A keyword only counts as a whole word: "tanah"
+    # is not found in "pertanahan"
+
+    def __init__(self, keywords: list):
+        self.keywords = list(keywords)
+        goto = [{}]
+        outputs = [set()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for character in keyword:
+                if character not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][character] = len(goto) - 1
+                state = goto[state][character]
+            outputs[state].add(index)
+
+        # Breadth-first over the trie, folding failure links into a full transition table so the
+        # scan is a single dict lookup per character; characters outside the keywords go to the root
+        alphabet = {character for keyword in self.keywords for character in keyword}
+        fail = [0] * len(goto)
+        delta = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            for character in alphabet:
+                child = goto[state].get(character)
+                if child is not None:
+                    fail[child] = delta[fail[state]].get(character, 0)
+                    queue.append(child)
+                    delta[state][character] = child
+                else:
+                    delta[state][character] = delta[fail[state]].get(character, 0)
+            # Drop transitions back to the root to keep the table small (shallower states are already trimmed)
+            delta[state] = {character: target for character, target in delta[state].items() if target}
+
+        self._delta = delta
+        self._outputs = [frozenset(found) for found in outputs]
+        # Length of each keyword, and whether its first and last characters need a non-word neighbour
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        self._bounded = [(keyword[:1].isalnum(), keyword[-1:].isalnum()) for keyword in self.keywords]
+
+    # Function to return the indices of the keywords occurring in a normalized text
+    def find(self, text: str) -> set:
+        delta, outputs, lengths, bounded = self._delta, self._outputs, self._lengths, self._bounded
+        found = set()
+        state = 0
+        for position, character in enumerate(text):
+            state = delta[state].get(character, 0)
+            if outputs[state]:
+                after = position + 1 < len(text) and text[position + 1].isalnum()
+                for index in outputs[state] - found:
+                    start = position + 1 - lengths[index]
+                    before = start > 0 and text[start - 1].isalnum()
+                    if not (bounded[index][0] and before) and not (bounded[index][1] and after):
+                        found.add(index)
+        return found
+
+    # Function to return {keyword: row positions of the texts containing it}
+    def scan(self, texts) -> dict:
+        rows = {keyword: [] for keyword in self.keywords}
+        for position, text in enumerate(texts):
+            for index in self.find(text):
+                rows[self.keywords[index]].append(position)
+        return rows
+
+
+def _matches_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(MATCHES_DIR, name + ".json")
+
+
+def _load_matches(path: str, digest: str) -> dict:
+    stored_path = _matches_path(path)
+    if not os.path.exists(stored_path):
+        return {}
+    with open(stored_path) as handle:
+        stored = json.load(handle)
+    if stored.get("hash") != digest or stored.get("version") != MATCHER_VERSION:
+        return {}
+    return {keyword: np.array(rows, dtype=np.int64) for keyword, rows in stored["matches"].items()}
+
+
+def _save_matches(path: str, digest: str, matches: dict):
+    os.makedirs(MATCHES_DIR, exist_ok=True)
+    write_json(_matches_path(path), {"hash": digest, "version": MATCHER_VERSION,
+                                     "matches": {keyword: rows.tolist() for keyword, rows in matches.items()}})
+
+
+# Function to return the rows of an article file containing each keyword. Matches are kept per file hash,
+# so only keywords not seen before for this version of the file are scanned for
+def keyword_matches(path: str, keywords: list) -> dict:
+    digest = file_hash(path)
+    matches = _matches_memo.get(path)
+    if matches is None or matches[0] != digest:
+        matches = (digest, _load_matches(path, digest))
+        _matches_memo[path] = matches
+    found = matches[1]
+
+    normalized = {keyword: " ".join(keyword.casefold().split()) for keyword in keywords}
+    missing = sorted({key for key in normalized.values() if key not in found})
+    if missing:
+        text_column = next(column for column in TEXT_COLUMNS if column in snapshot_columns(path))
+        with span(f"keyword scan {os.path.basename(path)}"):
+            texts = normalize_text(load_columns(path, [text_column])[text_column])
+            scanned = KeywordMatcher(missing).scan(texts)
+        # A new dict rather than an update in place: another session may be saving or reading the memoized one
+        found = {**found, **{keyword: np.array(rows, dtype=np.int64) for keyword, rows in scanned.items()}}
+        _matches_memo[path] = (digest, found)
+        _save_matches(path, digest, found)
+    return {keyword: found[key] for keyword, key in normalized.items()}
+
+
+# Function to count, per keyword and outlet, the distinct articles (by link) whose body contains the keyword
+def keyword_table(keywords: list = None, sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    keywords = load_keywords() if keywords is None else keywords
+    table = pd.DataFrame({"Keyword": keywords})
+    for media in OUTLETS:
+        links = {keyword: set() for keyword in keywords}
+        for (topic, source_media), path in sources.items():
+            if source_media != media or not os.path.exists(path):
+                continue
+            # An article found by both the PLTS and the PLTB search is counted once
+            link_column = next(column for column in LINK_COLUMNS if column in snapshot_columns(path))
+            article_links = get_dataset(path, [link_column])[link_column].to_numpy()
+            for keyword, rows in keyword_matches(path, keywords).items():
+                links[keyword].update(article_links[rows])
+        table[media] = [len(links[keyword]) for keyword in keywords]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the articles per outlet containing each search keyword.")
+    parser.add_argument("--add", action="append", default=[], metavar="KEYWORD",
+                        help="append a keyword to keywords.csv first (only it is scanned for)")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if args.add:
+        known = {keyword.casefold() for keyword in load_keywords()}
+        added = [keyword for keyword in args.add if keyword.strip() and keyword.strip().casefold() not in known]
+        if added:
+            pd.DataFrame({"Keyword": [keyword.strip() for keyword in added]}).to_csv(
+                KEYWORDS_FILE, mode="a", header=False, index=False)
+    print(keyword_table().to_string(index=False))
@@ -0,0 +1,186 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+from data_store import OUTLETS, TOPICS
+from timeline import GRANULARITIES, date_bounds
+
+
+# === LOAD TEST ===
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MediaAnalysis.py")
+
+# Widgets a viewer typically touches, by key
+YEAR_SLIDERS = [
+    ("detik_plts_start_year", "detik_plts_end_year"),
+    ("cnbc_plts_start_year", "cnbc_plts_end_year"),
+    ("tribun_plts_start_year", "tribun_plts_end_year"),
+    ("detik_pltb_start_year", "detik_pltb_end_year"),
+    ("cnbc_pltb_start_year", "cnbc_pltb_end_year"),
+    ("tribun_pltb_start_year", "tribun_pltb_end_year"),
+]
+ENTITY_SELECTBOXES = ["PLTS Word Cloud", "pltb_entity_type", "detik_entity_type", "CNBC PLTS WC", "Tribun PLTS WC",
+                      "Detik PLTB WC", "CNBC PLTB WC", "Tribun PLTB WC"]
+TOP_N_SLIDERS = ["plts_top_n", "pltb_top_n", "slider1", "slider2", "slider3", "slider Detik PLTB WC",
+                 "slider CNBC PLTB WC", "slider Tribun PLTB WC"]
+# Widgets of the network, timeline and central ideas sections and the article counts switch, by key and choices
+MULTISELECTS = {"network_media": list(OUTLETS), "network_topics": TOPICS,
+                "network_entity_types": ["Individuals", "Organizations"]}
+YEAR_RANGE_SLIDERS = ["network_years", "ideas_years"]
+STEP_SLIDERS = {"network_nodes": list(range(10, 101, 5)), "ideas_terms": list(range(10, 41, 5))}
+RADIOS = {"article_counts": ["Raw", "Deduplicated"], "timeline_granularity": list(GRANULARITIES),
+          "ideas_method": ["log-odds", "tf-idf"]}
+SELECTBOXES = {"timeline_topic": TOPICS, "ideas_media": ["All outlets"] + list(OUTLETS)}
+DATE_RANGES = ["timeline_dates"]
+
+
+# Function to apply one random widget interaction to a session, returning a description of it
+def interact(app, rng: random.Random) -> str:
+    kind = rng.choice(["year", "entity", "top_n", "multiselect", "year_range", "step", "radio", "select", "dates"])
+    if kind == "multiselect":
+        key = rng.choice(list(MULTISELECTS))
+        value = rng.sample(MULTISELECTS[key], rng.randint(1, len(MULTISELECTS[key])))
+        app.sidebar.multiselect(key=key).set_value(value)
+        return f"{key}={value}"
+    if kind == "year_range":
+        key = rng.choice(YEAR_RANGE_SLIDERS)
+        first_day, last_day = date_bounds()
+        start = rng.randint(first_day.year, last_day.year)
+        value = (start, rng.randint(start, last_day.year))
+        app.sidebar.slider(key=key).set_value(value)
+        return f"{key}={value}"
+    if kind == "step":
+        key = rng.choice(list(STEP_SLIDERS))
+        value = rng.choice(STEP_SLIDERS[key])
+        app.sidebar.slider(key=key).set_value(value)
+        return f"{key}={value}"
+    if kind == "radio":
+        key = rng.choice(list(RADIOS))
+        value = rng.choice(RADIOS[key])
+        app.sidebar.radio(key=key).set_value(value)
+        return f"{key}={value}"
+    if kind == "select":
+        key = rng.choice(list(SELECTBOXES))
+        value = rng.choice(SELECTBOXES[key])
+        app.sidebar.selectbox(key=key).select(value)
+        return f"{key}={value}"
+    if kind == "dates":
+        key = rng.choice(DATE_RANGES)
+        first_day, last_day = date_bounds()
+        span_days = (last_day - first_day).days
+        start = first_day + datetime.timedelta(days=rng.randint(0, span_days))
+        end = start + datetime.timedelta(days=rng.randint(0, (last_day - start).days))
+        app.sidebar.date_input(key=key).set_value((start, end))
+        return f"{key}={start}..{end}"
+    if kind == "year":
+        start_key, end_key = rng.choice(YEAR_SLIDERS)
+        first_day, last_day = date_bounds()
+        start = rng.randint(first_day.year, last_day.year)
+        end = rng.randint(start, last_day.year)
+        app.sidebar.slider(key=start_key).set_value(start)
+        app.sidebar.slider(key=end_key).set_value(end)
+        return f"{start_key}={start},{end_key}={end}"
+    if kind == "entity":
+        key = rng.choice(ENTITY_SELECTBOXES)
+        value = rng.choice(["Individuals", "Organizations"])
+        app.sidebar.selectbox(key=key).select(value)
+        return f"{key}={value}"
+    key = rng.choice(TOP_N_SLIDERS)
+    value = rng.randrange(10, 101, 10)
+    app.sidebar.slider(key=key).set_value(value)
+    return f"{key}={value}"
+
+
+# Function run by each simulated viewer: open the app, then interact with it
+def run_session(index: int, interactions: int, seed: int, timeout: float, results: dict, start_barrier):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + index)
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    start_barrier.wait()
+
+    started = time.perf_counter()
+    app.run()
+    results["initial"].append(time.perf_counter() - started)
+    if app.exception:
+        results["errors"].append({"session": index, "action": "initial", "error": app.exception[0].message})
+
+    for _ in range(interactions):
+        action = interact(app, rng)
+        started = time.perf_counter()
+        app.run()
+        results["reruns"].append(time.perf_counter() - started)
+        if app.exception:
+            results["errors"].append({"session": index, "action": action, "error": app.exception[0].message})
+
+
+def percentiles_ms(samples: list) -> dict:
+    if not samples:
+        return {}
+    values = np.array(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "mean": round(float(values.mean()), 2),
+        "max": round(float(values.max()), 2),
+    }
+
+
+# Function to simulate concurrent viewers against one in-process app runtime and report latency and memory
+def run_load_test(sessions: int = 8, interactions: int = 20, seed: int = 0, timeout: float = 300) -> dict:
+    results = {"initial": [], "reruns": [], "errors": []}
+    start_barrier = threading.Barrier(sessions)
+    threads = [threading.Thread(target=run_session, args=(index, interactions, seed, timeout, results, start_barrier))
+               for index in range(sessions)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "sessions": sessions,
+        "interactions_per_session": interactions,
+        "seed": seed,
+        "wall_seconds": round(elapsed, 3),
+        "initial_run_ms": percentiles_ms(results["initial"]),
+        "rerun_ms": percentiles_ms(results["reruns"]),
+        "throughput_reruns_per_second": round((len(results["initial"]) + len(results["reruns"])) / elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "errors": results["errors"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard viewers and report rerun latency.")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated viewers")
+    parser.add_argument("--interactions", type=int, default=20, help="widget interactions per viewer")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the interaction sequence")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per rerun")
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    # The app reads its data files relative to the working directory
+    os.chdir(os.path.dirname(APP_PATH))
+    report = run_load_test(args.sessions, args.interactions, args.seed, args.timeout)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    sys.exit(1 if report["errors"] else 0)
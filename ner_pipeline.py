@@ -0,0 +1,329 @@
+import abc
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_store import ARTICLE_SOURCES, LINK_COLUMNS, OUTLETS, TEXT_COLUMNS, TOPICS, load_columns, write_json
+from entity_index import COUNT_FILES
+from entity_normalize import normalize_entities
+
+
+# === NER AGGREGATION PIPELINE ===
+
+# Count files produced by the pipeline and the (topic, media) article sources feeding each of them
+COUNT_OUTPUTS = {
+    "corpus_cleaned.csv": [source for source in ARTICLE_SOURCES if source[0] == "PLTS"],
+    "pltb_wordcloud.csv": [source for source in ARTICLE_SOURCES if source[0] == "PLTB"],
+    **{outlet["counts"][topic]: [(topic, media)]
+       for topic in TOPICS for media, outlet in OUTLETS.items() if topic in outlet.get("counts", {})},
+}
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ner")
+
+# Fixed entity vocabulary of the dictionary extractor (NER_Label,Entity,Counts,Capitalized). It is rebuilt on
+# demand with --build-gazetteer, never from the count files a run rewrites, so the vocabulary and the
+# incremental cache stay stable from one run to the next
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entity_gazetteer.csv")
+
+# Names almost never capitalized in the articles ("dan", "yang") are function words the model mistagged
+MIN_CAPITALIZED = 0.05
+
+# Scraper boilerplate the model tagged as an organization ("ADVERTISEMENTSCROLL TO CONTINUE WITH CONTENT")
+BOILERPLATE_PATTERN = r"advertisement|scroll to continue"
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class EntityExtractor(abc.ABC):
+    # Interface for entity extractors: extract() returns (NER_Label, Entity) pairs, one per mention
+
+    # Identifies the extractor's configuration so cached results are not reused across extractors
+    cache_id = "base"
+
+    @abc.abstractmethod
+    def extract(self, text: str) -> list:
+        ...
+
+
+class DictionaryExtractor(EntityExtractor):
+    # Gazetteer matcher: longest match of known entity token sequences in the article text. Mentions are
+    # returned as they are written in the article, so "PT PLN (Persero)" keeps its case and punctuation
+
+    def __init__(self, vocabulary: dict, case_sensitive: bool = False):
+        # vocabulary maps NER_Label to {entity string: count}; a name listed under several labels gets the
+        # label it was counted under most often
+        self.case_sensitive = case_sensitive
+        best = {}
+        for label in sorted(vocabulary):
+            for entity, count in vocabulary[label].items():
+                tokens = tuple(self._tokens(str(entity)))
+                if tokens and (tokens not in best or count > best[tokens][2]):
+                    best[tokens] = (label, str(entity), count)
+        self._phrases = {}
+        for tokens, (label, entity, _) in best.items():
+            self._phrases.setdefault(tokens[0], {})[tokens] = (label, entity)
+        # Candidates per first token, longest first
+        self._candidates = {first: sorted(phrases.items(), key=lambda item: -len(item[0]))
+                            for first, phrases in self._phrases.items()}
+
+        digest = hashlib.sha1(f"case={case_sensitive}\n".encode("utf-8"))
+        for tokens in sorted(best):
+            digest.update(f"{best[tokens][0]}\t{' '.join(tokens)}\n".encode("utf-8"))
+        self.cache_id = "dictionary-" + digest.hexdigest()[:16]
+
+    @classmethod
+    def from_gazetteer(cls, path: str = GAZETTEER_FILE, case_sensitive: bool = False):
+        gazetteer = pd.read_csv(path, keep_default_na=False)
+        vocabulary = {}
+        for label, group in gazetteer.groupby("NER_Label"):
+            vocabulary[label] = dict(zip(group["Entity"], group["Counts"]))
+        return cls(vocabulary, case_sensitive)
+
+    def _tokens(self, text: str) -> list:
+        return TOKEN_PATTERN.findall(text) if self.case_sensitive else tokenize(text)
+
+    # Function to list the vocabulary as (NER_Label, Entity) pairs
+    def vocabulary(self) -> list:
+        return sorted(entry for phrases in self._phrases.values() for entry in phrases.values())
+
+    # Function to find the mentions of a text as (NER_Label, vocabulary Entity, text as written) triples
+    def matches(self, text: str) -> list:
+        spans = list(TOKEN_PATTERN.finditer(text))
+        tokens = [span.group() if self.case_sensitive else span.group().lower() for span in spans]
+        found = []
+        position = 0
+        while position < len(tokens):
+            match = None
+            for phrase, entry in self._candidates.get(tokens[position], ()):
+                if tuple(tokens[position:position + len(phrase)]) == phrase:
+                    match = (phrase, entry)
+                    break
+            if match:
+                written = text[spans[position].start():spans[position + len(match[0]) - 1].end()]
+                found.append((match[1][0], match[1][1], written))
+                position += len(match[0])
+            else:
+                position += 1
+        return found
+
+    def extract(self, text: str) -> list:
+        return [(label, written) for label, _, written in self.matches(text)]
+
+
+# Function to build the gazetteer from NER_Label,Entity,Counts files and the article text. Names counted at
+# least min_count times and not noise (see entity_normalize) are kept if the articles mention them, at least
+# MIN_CAPITALIZED of the time with a capital letter; each is stored as it is most often written, with that share
+def build_gazetteer(paths=None, min_count: int = 2, min_length: int = 3) -> pd.DataFrame:
+    frames = [pd.read_csv(path) for path in paths or sorted(set(COUNT_FILES.values())) if os.path.exists(path)]
+    counts = pd.concat(frames).dropna(subset=["Entity"]) if frames else pd.DataFrame(columns=["NER_Label", "Entity", "Counts"])
+    # Sentence punctuation the model kept at the edges of a name ("pln,", "esdm.") is not part of it
+    counts = counts.assign(Entity=counts["Entity"].astype(str).str.strip(" .,;:!?\"'"))
+    counts = counts[(counts["Counts"] >= min_count) & (counts["Entity"].str.len() >= min_length)]
+    counts = counts[normalize_entities(counts["Entity"], {}).notna()
+                    & ~counts["Entity"].str.contains(BOILERPLATE_PATTERN, case=False, regex=True)]
+    counts = counts.groupby(["NER_Label", "Entity"])["Counts"].sum()
+    vocabulary = {}
+    for (label, entity), count in counts.items():
+        vocabulary.setdefault(label, {})[entity] = int(count)
+    extractor = DictionaryExtractor(vocabulary)
+
+    written = Counter()
+    for path in ARTICLE_SOURCES.values():
+        if not os.path.exists(path):
+            continue
+        columns = pd.read_csv(path, nrows=0).columns
+        text_column = next(column for column in TEXT_COLUMNS if column in columns)
+        for text in load_columns(path, [text_column])[text_column].dropna().astype(str):
+            written.update((label, entity, mention) for label, entity, mention in extractor.matches(text))
+
+    rows = {}
+    for (label, entity, mention), count in written.items():
+        row = rows.setdefault((label, entity), {"forms": Counter(), "capitalized": 0})
+        row["forms"][mention] += count
+        row["capitalized"] += count if mention[:1].isupper() else 0
+    gazetteer = pd.DataFrame([
+        {"NER_Label": label, "Entity": row["forms"].most_common(1)[0][0], "Counts": vocabulary[label][entity],
+         "Capitalized": round(row["capitalized"] / sum(row["forms"].values()), 3)}
+        for (label, entity), row in rows.items()
+    ], columns=["NER_Label", "Entity", "Counts", "Capitalized"])
+    gazetteer = gazetteer[gazetteer["Capitalized"] >= MIN_CAPITALIZED]
+    # Spellings that differ only in punctuation can collapse onto one written form
+    gazetteer = gazetteer.sort_values("Counts", ascending=False, kind="stable").drop_duplicates(["NER_Label", "Entity"])
+    return gazetteer.sort_values(["NER_Label", "Entity"], ignore_index=True)
+
+
+_worker_extractor = None
+
+
+def _init_worker(extractor: EntityExtractor):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+# Function run in the worker processes: entity counts for a batch of ((link hash, content hash), text) pairs
+def _extract_batch(batch: list) -> list:
+    results = []
+    for key, text in batch:
+        counts = Counter(_worker_extractor.extract(text))
+        results.append((key, [[label, entity, count] for (label, entity), count in counts.items()]))
+    return results
+
+
+def link_hash(link) -> str:
+    return hashlib.sha1(str(link).strip().encode("utf-8")).hexdigest()
+
+
+def content_hash(text) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+def _results_path(extractor: EntityExtractor, source: str) -> str:
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(RESULTS_DIR, extractor.cache_id, name + ".json")
+
+
+def _load_results(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _save_results(path: str, results: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json(path, results)
+
+
+# Function to stream one article file and return its entity counts, extracting only new or changed articles.
+# Returns the counts and {"articles": rows read, "extracted": rows sent to the extractor}
+def process_source(source: str, extractor: EntityExtractor, pool=None, chunksize: int = 500,
+                   batch_size: int = 25) -> tuple:
+    columns = pd.read_csv(source, nrows=0).columns
+    link_column = next(column for column in LINK_COLUMNS if column in columns)
+    text_column = next(column for column in TEXT_COLUMNS if column in columns)
+
+    # Stored per link hash as {content hash: entities}; a link scraped twice with different bodies keeps both
+    results_path = _results_path(extractor, source)
+    results = _load_results(results_path)
+    seen = set()
+    totals = Counter()
+    stats = {"articles": 0, "extracted": 0}
+
+    for chunk in pd.read_csv(source, usecols=[link_column, text_column], chunksize=chunksize):
+        chunk = chunk.dropna(subset=[link_column])
+        texts = chunk[text_column].fillna("").astype(str)
+        keys = [link_hash(link) for link in chunk[link_column]]
+        shas = [content_hash(text) for text in texts]
+
+        pending = {}
+        for key, sha, text in zip(keys, shas, texts):
+            if sha not in results.get(key, {}):
+                pending[(key, sha)] = text
+
+        items = list(pending.items())
+        batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+        extracted = pool.map(_extract_batch, batches) if pool else map(_extract_batch, batches)
+        for batch in extracted:
+            for (key, sha), entities in batch:
+                results.setdefault(key, {})[sha] = entities
+
+        # Every row counts, so links scraped twice are counted twice as in the original files
+        for key, sha in zip(keys, shas):
+            seen.add((key, sha))
+            for label, entity, count in results[key][sha]:
+                totals[(label, entity)] += count
+        stats["articles"] += len(keys)
+        stats["extracted"] += len(pending)
+
+    # Drop results of articles that are no longer in the file
+    results = {key: {sha: entities for sha, entities in versions.items() if (key, sha) in seen}
+               for key, versions in results.items()}
+    _save_results(results_path, {key: versions for key, versions in results.items() if versions})
+    return totals, stats
+
+
+def counts_frame(totals: Counter) -> pd.DataFrame:
+    rows = [(label, entity, count) for (label, entity), count in totals.items()]
+    frame = pd.DataFrame(rows, columns=["NER_Label", "Entity", "Counts"])
+    return frame.sort_values(["NER_Label", "Entity"], ignore_index=True)
+
+
+# Function to regenerate the NER_Label,Entity,Counts files from the article files. An output is only written
+# when all of its article files exist, so a missing file never replaces a count file with partial counts.
+# Returns the files written, the stats of each article file (None for a missing file) and, per output not
+# written, its missing article files
+def run_pipeline(extractor: EntityExtractor = None, output_dir: str = "ner_output", workers: int = None,
+                 chunksize: int = 500) -> tuple:
+    extractor = extractor or DictionaryExtractor.from_gazetteer()
+    workers = workers or os.cpu_count() or 1
+
+    per_source = {}
+    stats = {}
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(extractor,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(extractor)
+    try:
+        for source_key, path in ARTICLE_SOURCES.items():
+            if not os.path.exists(path):
+                stats[path] = None
+                continue
+            per_source[source_key], stats[path] = process_source(path, extractor, pool, chunksize)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    os.makedirs(output_dir, exist_ok=True)
+    written, skipped = {}, {}
+    for output, sources in COUNT_OUTPUTS.items():
+        missing = [ARTICLE_SOURCES[source_key] for source_key in sources if source_key not in per_source]
+        if missing:
+            skipped[output] = missing
+            continue
+        totals = Counter()
+        for source_key in sources:
+            totals.update(per_source.get(source_key, Counter()))
+        target = os.path.join(output_dir, output)
+        counts_frame(totals).to_csv(target, index=False)
+        written[output] = target
+    return written, stats, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the aggregated entity count files from the article files.")
+    parser.add_argument("--output-dir", default="ner_output",
+                        help="where to write the count files (use . to replace the dashboard's files)")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=500, help="articles read per chunk")
+    parser.add_argument("--build-gazetteer", action="store_true",
+                        help=f"rebuild {os.path.basename(GAZETTEER_FILE)} from the current count files and exit")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if args.build_gazetteer:
+        gazetteer = build_gazetteer()
+        gazetteer.to_csv(GAZETTEER_FILE, index=False)
+        print(f"wrote {len(gazetteer)} entities to {GAZETTEER_FILE}")
+        raise SystemExit(0)
+
+    written, stats, skipped = run_pipeline(output_dir=args.output_dir, workers=args.workers,
+                                           chunksize=args.chunksize)
+    for path, source_stats in stats.items():
+        if source_stats is None:
+            print(f"skip {path}: not found")
+        else:
+            print(f"{path}: {source_stats['articles']} articles, {source_stats['extracted']} extracted, "
+                  f"{source_stats['articles'] - source_stats['extracted']} reused")
+    for target in written.values():
+        print(f"wrote {target}")
+    for output, missing in skipped.items():
+        print(f"WARNING: not writing {output}: missing {', '.join(missing)}")
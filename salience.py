@@ -0,0 +1,411 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from data_store import ARTICLE_SOURCES, OUTLETS, TEXT_COLUMNS, atomic_write, file_hash, stream_columns, write_json
+from instrumentation import span
+
+
+# === CENTRAL IDEAS: TERM SALIENCE ===
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "salience")
+
+# Bump when the tokenization or counting rules change so stored counts are rebuilt
+SALIENCE_VERSION = 2
+
+# Terms (words and two-word phrases) are hashed into this many sparse features instead of a growing vocabulary
+NUM_FEATURES = 2 ** 20
+# Articles tokenized per chunk read from the snapshot (or the CSV), so the whole text is never in memory
+CHUNK_ARTICLES = 500
+# Articles are counted per outlet, topic and bucket of this many years
+BUCKET_YEARS = 1
+# Bucket of the articles without a year
+NO_YEAR = 0
+
+# Shortest word kept; words with digits are dropped
+MIN_WORD_LENGTH = 3
+# Pseudo-counts of the log-odds prior, spread over the terms in proportion to their overall frequency
+PRIOR_WEIGHT = 1000
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Indonesian function words, reporting verbs and page boilerplate left by the scraper
+STOPWORDS = frozenset("""
+yang dan di ke dari ini itu dengan untuk pada dalam tidak akan juga ada atau oleh karena sebagai bisa telah sudah
+lebih kata saat para tersebut bahwa adalah kami kita mereka dia namun hingga serta sehingga agar jika maka masih
+baru hal antara setelah sejak belum secara menjadi dapat tahun hari per pun lalu yakni yaitu tak nya lagi sangat
+harus banyak salah satu dua tiga sekitar pula bagi tetapi tapi sementara terhadap melalui kepada sebuah seperti
+bahkan hanya sendiri selain demikian begitu kemudian ujar ucap jelas ungkap katanya sebut tutur menurut mengatakan
+menjelaskan tersebut apa siapa bagaimana mana kapan kini akan nanti sebelumnya selama semua seluruh tiap setiap
+saja punya memiliki merupakan ialah yakin the and for com www https http
+advertisement advertisementscroll scroll continue content resume baca halaman berikutnya artikel video foto klik simak selengkapnya
+""".split())
+
+_counts_memo = {}
+
+
+# Function to split an article into its terms: the words that are not stopwords, and each pair of such
+# words that follow each other
+def tokenize(text: str) -> list:
+    words = [word if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS else None
+             for word in WORD_PATTERN.findall(text.casefold())]
+    terms = [word for word in words if word]
+    terms += [f"{first} {second}" for first, second in zip(words, words[1:]) if first and second]
+    return terms
+
+
+def feature(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) % NUM_FEATURES
+
+
+def year_bucket(year) -> int:
+    if pd.isna(year):
+        return NO_YEAR
+    return int(year) // BUCKET_YEARS * BUCKET_YEARS
+
+
+class TermCounts:
+    # Hashed term counts of one article file per year bucket: term frequency (tf), the number of articles
+    # using each term (df) and the number of articles, plus the names of the hashed terms
+
+    def __init__(self, buckets: list, tf, df, documents: np.ndarray, terms: dict, articles: dict,
+                 rivals: dict = None):
+        from scipy import sparse
+
+        self.buckets = list(buckets)
+        shape = (len(self.buckets), NUM_FEATURES)
+        self.tf = sparse.csr_matrix(tf if tf is not None else shape, shape=shape, dtype=np.int64)
+        self.df = sparse.csr_matrix(df if df is not None else shape, shape=shape, dtype=np.int64)
+        self.documents = np.asarray(documents, dtype=np.int64)
+        self.terms = terms
+        # Content hash -> number of rows with that text already counted, to add only new articles on update
+        self.articles = articles
+        # Feature -> {term: occurrences} of the features several terms were hashed to
+        self.rivals = rivals or {}
+
+    # Function to return {term: occurrences} of the named terms of a feature, given the feature totals
+    def names(self, index: int, totals: np.ndarray) -> dict:
+        if index in self.rivals:
+            return self.rivals[index]
+        return {self.terms[index]: int(totals[index])} if index in self.terms else {}
+
+    # Function to name the features after the terms of a chunk ({term: occurrences}), before the chunk is added.
+    # A feature several terms were hashed to is named after the most frequent of them
+    def name(self, occurrences: dict):
+        by_feature = {}
+        for term in occurrences:
+            by_feature.setdefault(feature(term), []).append(term)
+        totals = None
+        for index, terms in by_feature.items():
+            named = self.terms.get(index)
+            rivals = self.rivals.get(index)
+            if rivals is None and (len(terms) > 1 or named not in (None, terms[0])):
+                # Up to this chunk, every occurrence of the feature was of the term it is named after
+                if totals is None:
+                    totals = np.asarray(self.tf.sum(axis=0)).ravel()
+                rivals = self.rivals[index] = {named: int(totals[index])} if named is not None else {}
+            if rivals is None:
+                self.terms[index] = terms[0]
+                continue
+            for term in terms:
+                rivals[term] = rivals.get(term, 0) + occurrences[term]
+            self.terms[index] = max(rivals, key=rivals.get)
+
+    # Function to add a chunk of articles: rows of hashed term counts, the year bucket of each row and the
+    # occurrences of each term in the chunk
+    def add(self, rows, buckets: list, occurrences: dict):
+        from scipy import sparse
+
+        self.name(occurrences)
+        for bucket in sorted(set(buckets) - set(self.buckets)):
+            self.buckets.append(bucket)
+            self.documents = np.append(self.documents, 0)
+        self.tf.resize((len(self.buckets), NUM_FEATURES))
+        self.df.resize((len(self.buckets), NUM_FEATURES))
+
+        # One sparse product folds the article rows into their buckets
+        positions = [self.buckets.index(bucket) for bucket in buckets]
+        assign = sparse.csr_matrix((np.ones(len(positions), dtype=np.int64), (positions, range(len(positions)))),
+                                   shape=(len(self.buckets), len(positions)))
+        self.tf = (self.tf + assign @ rows).tocsr()
+        self.df = (self.df + assign @ (rows > 0).astype(np.int64)).tocsr()
+        self.documents += np.bincount(positions, minlength=len(self.buckets))
+
+    # Function to sum the buckets of a year range: tf and df as dense rows over the features, and the article count
+    def select(self, start_year: int, end_year: int) -> tuple:
+        chosen = [position for position, bucket in enumerate(self.buckets)
+                  if bucket != NO_YEAR and start_year <= bucket <= end_year]
+        tf = np.asarray(self.tf[chosen].sum(axis=0)).ravel()
+        df = np.asarray(self.df[chosen].sum(axis=0)).ravel()
+        return tf, df, int(self.documents[chosen].sum())
+
+
+def _results_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(RESULTS_DIR, name)
+
+
+def _load_counts(path: str):
+    from scipy import sparse
+
+    stored = _results_path(path)
+    if not os.path.exists(stored + ".json") or not os.path.exists(stored + ".npz"):
+        return None
+    with open(stored + ".json") as handle:
+        meta = json.load(handle)
+    if meta.get("version") != SALIENCE_VERSION:
+        return None
+    counts = sparse.load_npz(stored + ".npz").tocsr()
+    half = len(meta["buckets"])
+    counts = TermCounts(meta["buckets"], counts[:half], counts[half:], meta["documents"],
+                        {int(index): term for index, term in meta["terms"].items()}, meta["articles"],
+                        {int(index): rivals for index, rivals in meta["rivals"].items()})
+    return meta["hash"], counts
+
+
+def _save_counts(path: str, digest: str, counts: TermCounts):
+    from scipy import sparse
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stored = _results_path(path)
+    # Only the names of terms used more than once can rank, so single-use ones are not stored
+    used = set(np.flatnonzero(np.asarray(counts.tf.sum(axis=0)).ravel() > 1).tolist())
+    meta = {"version": SALIENCE_VERSION, "hash": digest, "buckets": counts.buckets,
+            "documents": counts.documents.tolist(), "articles": counts.articles,
+            "terms": {str(index): term for index, term in counts.terms.items() if index in used},
+            "rivals": {str(index): rivals for index, rivals in counts.rivals.items() if index in used}}
+    matrix = sparse.vstack([counts.tf, counts.df], format="csr")
+    atomic_write(stored + ".npz", lambda temporary: sparse.save_npz(temporary, matrix))
+    write_json(stored + ".json", meta)
+
+
+# Function to stream an article file's text and year in chunks, yielding (content hashes, texts, year buckets)
+def _stream_articles(path: str):
+    for chunk in stream_columns(path, TEXT_COLUMNS + ["Year"], CHUNK_ARTICLES):
+        text_column = next((column for column in TEXT_COLUMNS if column in chunk), None)
+        texts = chunk[text_column].fillna("").astype(str).tolist() if text_column else [""] * len(chunk)
+        years = chunk["Year"] if "Year" in chunk else pd.Series([None] * len(chunk))
+        yield ([hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts], texts,
+               [year_bucket(year) for year in years])
+
+
+# Function to count the terms of a chunk of texts as a sparse (articles x features) matrix, with the
+# occurrences of each term
+def _count_chunk(texts: list) -> tuple:
+    from scipy import sparse
+
+    rows, columns = [], []
+    occurrences = Counter()
+    for row, text in enumerate(texts):
+        terms = tokenize(text)
+        occurrences.update(terms)
+        rows.extend([row] * len(terms))
+        columns.extend(feature(term) for term in terms)
+    data = np.ones(len(rows), dtype=np.int64)
+    # Duplicate (row, feature) entries are summed into term frequencies
+    return sparse.csr_matrix((data, (rows, columns)), shape=(len(texts), NUM_FEATURES)), occurrences
+
+
+# Function to bring the counts of an article file up to date. Only articles not counted before are tokenized;
+# if an article was removed or edited the file is recounted from scratch. Returns the counts and the number
+# of articles tokenized
+def update_counts(path: str, counts: TermCounts = None) -> tuple:
+    counts = counts or TermCounts([], None, None, [], {}, {})
+    seen = {}
+    added = 0
+    for hashes, texts, buckets in _stream_articles(path):
+        new = []
+        for position, digest in enumerate(hashes):
+            seen[digest] = seen.get(digest, 0) + 1
+            if seen[digest] > counts.articles.get(digest, 0):
+                new.append(position)
+        if new:
+            rows, occurrences = _count_chunk([texts[position] for position in new])
+            counts.add(rows, [buckets[position] for position in new], occurrences)
+            added += len(new)
+    if any(seen.get(digest, 0) < number for digest, number in counts.articles.items()):
+        return update_counts(path)
+    counts.articles = seen
+    return counts, added
+
+
+# Function to return the term counts of an article file, updated incrementally when the file changes
+def get_counts(path: str) -> TermCounts:
+    digest = file_hash(path)
+    cached = _counts_memo.get(path)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    stored = _load_counts(path)
+    if stored is not None and stored[0] == digest:
+        counts = stored[1]
+    else:
+        with span(f"salience update {os.path.basename(path)}"):
+            counts, _ = update_counts(path, stored[1] if stored is not None else None)
+        _save_counts(path, digest, counts)
+    _counts_memo[path] = (digest, counts)
+    return counts
+
+
+# Function to sum the counts of the chosen topics and outlets over a year range; also returns the term counts
+# of the files summed
+def selection_counts(topics: list, medias: list, start_year: int, end_year: int,
+                     sources: dict = ARTICLE_SOURCES) -> tuple:
+    tf, df, documents, chosen = np.zeros(NUM_FEATURES, np.int64), np.zeros(NUM_FEATURES, np.int64), 0, []
+    for (topic, media), path in sources.items():
+        if topic in topics and media in medias and os.path.exists(path):
+            counts = get_counts(path)
+            selected = counts.select(start_year, end_year)
+            tf += selected[0]
+            df += selected[1]
+            documents += selected[2]
+            chosen.append(counts)
+    return tf, df, documents, chosen
+
+
+# Function to name the features of several files' term counts. Where the files name a feature after different
+# terms, it takes the name of the term most frequent over all of them
+def term_names(chosen: list) -> dict:
+    terms = {}
+    for counts in chosen:
+        terms.update(counts.terms)
+    clashes = set()
+    for counts in chosen:
+        clashes.update(index for index, _ in counts.terms.items() - terms.items())
+    if clashes:
+        totals = [np.asarray(counts.tf.sum(axis=0)).ravel() for counts in chosen]
+        for index in clashes:
+            tally = Counter()
+            for counts, total in zip(chosen, totals):
+                tally.update(counts.names(index, total))
+            terms[index] = max(tally, key=tally.get)
+    return terms
+
+
+# Function to score how distinctive each term is of the focus counts against the background counts:
+# log-odds ratio with an informative Dirichlet prior, as a z-score (Monroe, Colaresi & Quinn 2008)
+def log_odds(focus: np.ndarray, background: np.ndarray) -> tuple:
+    used = np.flatnonzero(focus + background)
+    focus, background = focus[used].astype(float), background[used].astype(float)
+    prior = PRIOR_WEIGHT * (focus + background) / max((focus + background).sum(), 1)
+    prior_total = prior.sum()
+    focus_total, background_total = focus.sum(), background.sum()
+    delta = (np.log((focus + prior) / (focus_total + prior_total - focus - prior))
+             - np.log((background + prior) / (background_total + prior_total - background - prior)))
+    variance = 1 / (focus + prior) + 1 / (background + prior)
+    return used, delta / np.sqrt(variance)
+
+
+# Function to list the terms most distinctive of a topic's coverage against the other topics, for some outlets
+# and years. method "log-odds" contrasts the topics; "tf-idf" ranks the topic's own frequent but specific terms
+def distinctive_terms(topic: str, medias: list, start_year: int, end_year: int, limit: int = 20,
+                      method: str = "log-odds", sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    other_topics = sorted({source_topic for source_topic, _ in sources if source_topic != topic})
+    focus, focus_df, documents, focus_counts = selection_counts([topic], medias, start_year, end_year, sources)
+    background, background_df, other_documents, other_counts = selection_counts(other_topics, medias, start_year,
+                                                                                end_year, sources)
+    terms = term_names(focus_counts + other_counts)
+    if not documents:
+        return pd.DataFrame(columns=["Term", "Score", f"{topic} mentions", "Other mentions", f"{topic} articles"])
+    if method == "tf-idf":
+        # Smoothed idf over all the selected articles of every topic
+        used = np.flatnonzero(focus)
+        frequency = focus_df[used] + background_df[used]
+        total = documents + other_documents
+        scores = focus[used] / max(focus.sum(), 1) * (np.log((1 + total) / (1 + frequency)) + 1) * 1000
+    else:
+        used, scores = log_odds(focus, background)
+    named = np.array([index in terms for index in used], dtype=bool)
+    used, scores = used[named], scores[named]
+    top = np.argsort(-scores, kind="stable")[:limit]
+    return pd.DataFrame({
+        "Term": [terms[index] for index in used[top]],
+        "Score": np.round(scores[top], 3),
+        f"{topic} mentions": focus[used[top]],
+        "Other mentions": background[used[top]],
+        f"{topic} articles": focus_df[used[top]],
+    })
+
+
+# Function to sum the counts of the chosen topics and outlets per year bucket, as sparse rows keyed by bucket
+def bucket_counts(topics: list, medias: list, sources: dict = ARTICLE_SOURCES) -> dict:
+    buckets = {}
+    for (topic, media), path in sources.items():
+        if topic in topics and media in medias and os.path.exists(path):
+            counts = get_counts(path)
+            for position, bucket in enumerate(counts.buckets):
+                row = counts.tf[position]
+                buckets[bucket] = buckets[bucket] + row if bucket in buckets else row
+    return buckets
+
+
+# Function to score chosen terms per year bucket (log-odds z-score of the topic against the others that year)
+def salience_over_time(topic: str, medias: list, terms: list, start_year: int, end_year: int,
+                       sources: dict = ARTICLE_SOURCES) -> pd.DataFrame:
+    other_topics = sorted({source_topic for source_topic, _ in sources if source_topic != topic})
+    focus_buckets = bucket_counts([topic], medias, sources)
+    background_buckets = bucket_counts(other_topics, medias, sources)
+    wanted = [feature(term) for term in terms]
+    columns = {}
+    for bucket in sorted(focus_buckets):
+        if bucket == NO_YEAR or not start_year <= bucket <= end_year:
+            continue
+        focus = focus_buckets[bucket].toarray().ravel()
+        background = (background_buckets[bucket].toarray().ravel() if bucket in background_buckets
+                      else np.zeros(NUM_FEATURES, np.int64))
+        used, scores = log_odds(focus, background)
+        lookup = dict(zip(used.tolist(), scores.tolist()))
+        columns[bucket] = [lookup.get(index, 0.0) for index in wanted]
+    return pd.DataFrame(columns, index=terms)
+
+
+# Function to draw the distinctive terms as horizontal bars, most distinctive on top
+def salience_bar_figure(terms: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    figure = go.Figure(go.Bar(x=terms["Score"][::-1].tolist(), y=terms["Term"][::-1].tolist(), orientation="h"))
+    figure.update_layout(xaxis_title="Distinctiveness", yaxis_title="Term", height=max(400, 22 * len(terms)))
+    return figure
+
+
+# Function to draw term x year salience as a heatmap
+def salience_heatmap(frame: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    figure = go.Figure(go.Heatmap(z=frame.to_numpy(), x=[str(year) for year in frame.columns], y=frame.index.tolist(),
+                                  colorscale="RdBu", zmid=0, colorbar={"title": "z"}))
+    figure.update_layout(xaxis_title="Year", yaxis={"autorange": "reversed"}, height=max(400, 22 * len(frame)))
+    return figure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the term counts and list the most distinctive terms.")
+    parser.add_argument("--years", nargs=2, type=int, default=[1900, 2100], metavar=("START", "END"))
+    parser.add_argument("--method", choices=["log-odds", "tf-idf"], default="log-odds")
+    parser.add_argument("--limit", type=int, default=15)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    for path in ARTICLE_SOURCES.values():
+        if not os.path.exists(path):
+            continue
+        stored = _load_counts(path)
+        if stored is not None and stored[0] == file_hash(path):
+            print(f"{path}: up to date")
+            continue
+        counts, added = update_counts(path, stored[1] if stored is not None else None)
+        _save_counts(path, file_hash(path), counts)
+        print(f"{path}: {added} articles tokenized, {int(counts.documents.sum()) - added} reused")
+
+    for topic in sorted({topic for topic, _ in ARTICLE_SOURCES}):
+        for media in OUTLETS:
+            if (topic, media) not in ARTICLE_SOURCES:
+                continue
+            terms = distinctive_terms(topic, [media], *args.years, limit=args.limit, method=args.method)
+            print(f"\n{media} {topic}: " + ", ".join(terms["Term"]))
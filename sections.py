@@ -0,0 +1,164 @@
+import ast
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from artifacts import load_artifact
+from data_store import file_hash
+from instrumentation import count, span
+
+
+# === SECTION DEPENDENCY GRAPH ===
+
+# Rendered outputs kept across reruns and sessions, bounded by count and by their approximate size
+MAX_ENTRIES = 512
+MAX_BYTES = int(float(os.environ.get("MEDIA_SECTION_BUDGET_MB", "128")) * 1024 * 1024)
+
+# Bump to invalidate every section output and pre-rendered artifact, e.g. after a change the keys cannot see
+APP_VERSION = 1
+
+# The dashboard script; the modules it imports make up the code every section key covers
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MediaAnalysis.py")
+
+SECTIONS = {}
+
+_outputs = OrderedDict()
+_sizes = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "artifact_hits": 0, "recomputes": 0}
+
+
+# Function to fingerprint a code object with the names it uses, descending into nested ones (comprehensions,
+# lambdas) whose repr carries a memory address that changes every time the script is recompiled
+def _code_fingerprint(code) -> bytes:
+    parts = [code.co_code, repr(code.co_names).encode("utf-8")]
+    for constant in code.co_consts:
+        parts.append(_code_fingerprint(constant) if hasattr(constant, "co_code") else repr(constant).encode("utf-8"))
+    return b"|".join(parts)
+
+
+# Function to list the dashboard script and the repo modules it imports, directly or through one another,
+# including imports inside functions. Read from the sources, so every process (the server, export workers) gets
+# the same list; dev tools the dashboard never imports (benchmark.py, export_site.py, ...) are not in it
+def app_modules(script: str = APP_SCRIPT) -> list:
+    directory = os.path.dirname(script)
+    pending, found = [script], set()
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(path, "rb") as handle:
+            tree = ast.parse(handle.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module_path = os.path.join(directory, name.split(".")[0] + ".py")
+                if os.path.exists(module_path):
+                    pending.append(module_path)
+    return sorted(found)
+
+
+# Function to hash the source of the app's own modules, so an edit to a helper a section calls (figure
+# builders, caches, normalization rules) invalidates its outputs too
+def _modules_fingerprint() -> str:
+    digest = hashlib.sha1(str(APP_VERSION).encode("utf-8"))
+    for path in app_modules():
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+MODULES_ID = _modules_fingerprint()
+
+
+# Function to estimate the memory held by a section's outputs
+def _output_bytes(value) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_output_bytes(item) for item in value)
+    if isinstance(value, bytes):
+        return len(value)
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "to_plotly_json"):
+        return len(value.to_json(validate=False))
+    return sys.getsizeof(value)
+
+
+class Section:
+    # A dashboard unit whose outputs depend only on its widget keys and data files
+
+    def __init__(self, name: str, compute, inputs=(), sources=(), version: int = 1):
+        self.name = name
+        self.compute = compute
+        self.inputs = list(inputs)
+        self.sources = list(sources)
+        # Editing the compute function, the values it closes over, the app's modules or the section's
+        # version invalidates its outputs
+        closure = tuple(cell.cell_contents for cell in compute.__closure__ or ())
+        self.code_id = hashlib.sha1(_code_fingerprint(compute.__code__) + repr(closure).encode("utf-8")
+                                    + f"|{version}|{MODULES_ID}".encode("utf-8")).hexdigest()
+
+    def key(self, state) -> tuple:
+        # Multiselect values are lists; freeze them so the key can be hashed
+        values = tuple(tuple(state[name]) if isinstance(state[name], list) else state[name] for name in self.inputs)
+        sources = tuple(file_hash(path) if os.path.exists(path) else None for path in self.sources)
+        return (self.name, self.code_id, values, sources)
+
+
+def register_section(name: str, compute, inputs=(), sources=(), version: int = 1) -> Section:
+    SECTIONS[name] = Section(name, compute, inputs, sources, version)
+    return SECTIONS[name]
+
+
+# Decorator form of register_section: compute receives the widget values in the order of inputs
+def section(name: str, inputs=(), sources=(), version: int = 1):
+    def register(compute):
+        register_section(name, compute, inputs, sources, version)
+        return compute
+    return register
+
+
+# Function to return a section's outputs, recomputing only when its widgets or data files changed and
+# no pre-rendered artifact (export_site.py) matches them
+def run_section(name: str, state):
+    unit = SECTIONS[name]
+    key = unit.key(state)
+    with _lock:
+        if key in _outputs:
+            _outputs.move_to_end(key)
+            _stats["hits"] += 1
+            count("section.hits")
+            return _outputs[key]
+
+    with span(f"artifact {name}"):
+        outputs = load_artifact(key)
+    if outputs is not None:
+        stat = "artifact_hits"
+    else:
+        stat = "recomputes"
+        with span(f"section {name}"):
+            outputs = unit.compute(*(state[input_name] for input_name in unit.inputs))
+    count(f"section.{stat}")
+    size = _output_bytes(outputs)
+    with _lock:
+        _stats[stat] += 1
+        _outputs[key] = outputs
+        _sizes[key] = size
+        # Drop the coldest outputs, always keeping the one just computed
+        while len(_outputs) > 1 and (len(_outputs) > MAX_ENTRIES or sum(_sizes.values()) > MAX_BYTES):
+            evicted, _ = _outputs.popitem(last=False)
+            del _sizes[evicted]
+    return outputs
+
+
+def section_stats() -> dict:
+    with _lock:
+        return dict(_stats, sections=len(SECTIONS), entries=len(_outputs), memory_bytes=sum(_sizes.values()))
@@ -0,0 +1,109 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import ARTICLE_SOURCES, file_hash, snapshot_columns
+from dataset_registry import derived, get_dataset
+from dedup import dedup_key, duplicate_rows
+
+
+# === PUBLICATION TIMELINE ===
+
+# Timeline granularities and their resampling rules (periods are labelled by their first day)
+GRANULARITIES = {"Month": "MS", "Week": "W-MON", "Day": "D"}
+
+# Picker bounds when no publication date could be parsed (the range the year sliders used to hard-code)
+FALLBACK_BOUNDS = (datetime.date(2000, 1, 1), datetime.date(2023, 12, 31))
+
+class Timeline:
+    # Sorted publication times of one article file, with its article counts pre-resampled per granularity
+
+    def __init__(self, published: pd.Series):
+        self._stamps = np.sort(published.dropna().to_numpy(dtype="datetime64[ns]"))
+        self._counts = {}
+        if len(self._stamps):
+            articles = pd.Series(1, index=pd.DatetimeIndex(self._stamps))
+            for granularity, rule in GRANULARITIES.items():
+                self._counts[granularity] = articles.resample(rule, label="left", closed="left").size()
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    # Memory held by the timeline, for the dataset registry's budget
+    @property
+    def nbytes(self) -> int:
+        return self._stamps.nbytes + sum(int(series.memory_usage()) for series in self._counts.values())
+
+    @property
+    def first(self):
+        return pd.Timestamp(self._stamps[0]) if len(self._stamps) else None
+
+    @property
+    def last(self):
+        return pd.Timestamp(self._stamps[-1]) if len(self._stamps) else None
+
+    # Function to count the articles published in [start, stop) by binary search on the sorted times
+    def count_between(self, start, stop) -> int:
+        start, stop = np.datetime64(start, "ns"), np.datetime64(stop, "ns")
+        return int(np.searchsorted(self._stamps, stop) - np.searchsorted(self._stamps, start))
+
+    # Function to return the article counts per period overlapping the days start..end (inclusive).
+    # Whole periods come from the precomputed counts; the two edge periods are recounted for the part in range
+    def counts(self, granularity: str, start, end) -> pd.Series:
+        series = self._counts.get(granularity)
+        if series is None:
+            return pd.Series(dtype="int64")
+        start = pd.Timestamp(start).normalize()
+        stop = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        labels = series.index.asi8
+        first = max(int(np.searchsorted(labels, start.value, side="right")) - 1, 0)
+        last = int(np.searchsorted(labels, stop.value, side="left"))
+        window = series.iloc[first:last].copy()
+        if window.empty:
+            return window
+
+        for position in {0, len(window) - 1}:
+            period_start = window.index[position]
+            period_stop = period_start + pd.tseries.frequencies.to_offset(GRANULARITIES[granularity])
+            if period_start < start or period_stop > stop:
+                window.iloc[position] = self.count_between(max(period_start, start), min(period_stop, stop))
+        return window
+
+
+# Function to return the timeline of an article file, rebuilt only when the file changes. The deduplicated
+# timeline leaves out the file's duplicate articles, which depend on the other files of the topic too
+def get_timeline(path: str, deduplicated: bool = False, sources: dict = ARTICLE_SOURCES) -> Timeline:
+    def build():
+        if "Published" in snapshot_columns(path):
+            published = get_dataset(path, ["Published"])["Published"]
+        else:
+            published = pd.Series(dtype="datetime64[ns]")
+        if deduplicated and len(published):
+            topic, media = next(source for source, source_path in sources.items() if source_path == path)
+            published = published[~duplicate_rows(topic, media, sources)]
+        return Timeline(published)
+
+    digest = dedup_key(sources) if deduplicated else file_hash(path)
+    return derived("timeline", (path, deduplicated), digest, build)
+
+
+# Function to return the first and last publication day over the article files, or FALLBACK_BOUNDS when
+# no file has a parsed date
+def date_bounds(sources: dict = ARTICLE_SOURCES) -> tuple:
+    timelines = [get_timeline(path) for path in sources.values() if os.path.exists(path)]
+    timelines = [timeline for timeline in timelines if len(timeline)]
+    if not timelines:
+        return FALLBACK_BOUNDS
+    return (min(timeline.first for timeline in timelines).date(), max(timeline.last for timeline in timelines).date())
+
+
+# Function to tabulate the per-period article counts of every outlet covering a topic, as period x media
+def topic_timeline(topic: str, granularity: str, start, end, sources: dict = ARTICLE_SOURCES,
+                   deduplicated: bool = False) -> pd.DataFrame:
+    columns = {}
+    for (source_topic, media), path in sources.items():
+        if source_topic == topic and os.path.exists(path):
+            columns[media] = get_timeline(path, deduplicated, sources).counts(granularity, start, end)
+    return pd.DataFrame(columns).fillna(0).astype("int64").sort_index()
@@ -0,0 +1,122 @@
+import argparse
+import importlib
+import os
+import threading
+import time
+
+from cooccurrence import incidence_matrix
+from count_cube import get_cube
+from data_store import ARTICLE_FILES, build_snapshot, is_stale
+from entity_index import COUNT_FILES, get_index
+from keyword_table import keyword_table
+from salience import get_counts
+from timeline import date_bounds
+
+
+# === BACKGROUND WARM-UP ===
+
+# Warm the caches in a background thread as soon as the server runs the script for the first time
+ENABLED = os.environ.get("MEDIA_WARMUP", "") not in ("", "0")
+
+# Modules the dashboard imports on first use; preloading them keeps that cost off the first viewer
+DEFERRED_MODULES = ["plotly.graph_objects", "plotly.subplots", "plotly.io", "scipy.sparse", "wordcloud"]
+
+_lock = threading.Lock()
+_state = {"started": 0.0, "finished": 0.0, "steps": {}, "errors": 0}
+
+
+def _warm_imports():
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
+
+def _warm_snapshots():
+    for path in ARTICLE_FILES + sorted(set(COUNT_FILES.values())):
+        if os.path.exists(path) and is_stale(path):
+            build_snapshot(path)
+
+
+def _warm_tables():
+    date_bounds()
+    get_cube()
+    get_cube(deduplicated=True)
+
+
+def _warm_entities():
+    for path in sorted(set(COUNT_FILES.values())):
+        if os.path.exists(path):
+            get_index(path)
+
+
+def _warm_keywords():
+    keyword_table()
+
+
+def _warm_cooccurrence():
+    incidence_matrix()
+
+
+def _warm_salience():
+    for path in ARTICLE_FILES:
+        if os.path.exists(path):
+            get_counts(path)
+
+
+# Steps in the order the page needs them
+STEPS = [
+    ("imports", _warm_imports),
+    ("snapshots", _warm_snapshots),
+    ("tables", _warm_tables),
+    ("entities", _warm_entities),
+    ("keywords", _warm_keywords),
+    ("cooccurrence", _warm_cooccurrence),
+    ("salience", _warm_salience),
+]
+
+
+# Function to run every warm-up step, recording how long each took; a failing step is skipped, not fatal
+def warm_up(verbose: bool = False):
+    _state["started"] = time.time()
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as error:
+            _state["errors"] += 1
+            if verbose:
+                print(f"{name:14s} failed: {error}")
+            continue
+        _state["steps"][name] = time.perf_counter() - started
+        if verbose:
+            print(f"{name:14s} {_state['steps'][name] * 1000:10.1f} ms")
+    _state["finished"] = time.time()
+
+
+# Function to start the warm-up thread once per process (when MEDIA_WARMUP is set, unless enable is given)
+def start_warmup(enable: bool = ENABLED):
+    if not enable:
+        return None
+    with _lock:
+        if "thread" not in _state:
+            _state["thread"] = threading.Thread(target=warm_up, name="media-warmup", daemon=True)
+            _state["thread"].start()
+        return _state["thread"]
+
+
+def warmup_stats() -> dict:
+    stats = {f"{name}_seconds": seconds for name, seconds in _state["steps"].items()}
+    stats["errors"] = _state["errors"]
+    stats["done"] = int(bool(_state["finished"]))
+    if _state["finished"]:
+        stats["total_seconds"] = _state["finished"] - _state["started"]
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the snapshots and caches the dashboard needs, e.g. at deploy time.")
+    parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    warm_up(verbose=True)
+    print(f"{'total':14s} {(time.perf_counter() - started) * 1000:10.1f} ms")
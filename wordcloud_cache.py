@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from data_store import file_hash, write_bytes
+from instrumentation import count, span
+
+
+# === WORD CLOUD RENDER CACHE ===
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "wordclouds")
+MEMORY_BUDGET_BYTES = 32 * 1024 * 1024
+
+# Bump when the rendering settings change so stale PNGs on disk are not served
+RENDER_VERSION = 1
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+# variant identifies any processing between the source file and the frequencies (e.g. normalization rules);
+# min_count is the count below which entities were left out of them
+def cache_key(source: str, entity_type: str, top_n: int, width: int, height: int, variant: str = "",
+              min_count: int = 1) -> str:
+    raw = f"{RENDER_VERSION}|{file_hash(source)}|{variant}|{entity_type}|{top_n}|{min_count}|{width}x{height}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, png: bytes):
+    global _memory_bytes
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return
+        _memory[key] = png
+        _memory_bytes += len(png)
+        # Evict least recently used renders until we are back under the byte budget
+        while _memory_bytes > MEMORY_BUDGET_BYTES and len(_memory) > 1:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def _lookup(key: str):
+    with _lock:
+        png = _memory.get(key)
+        if png is not None:
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+            count("wordcloud.memory_hits")
+            return png
+
+    disk_path = os.path.join(CACHE_DIR, key + ".png")
+    if os.path.exists(disk_path):
+        with open(disk_path, "rb") as handle:
+            png = handle.read()
+        with _lock:
+            _stats["disk_hits"] += 1
+        count("wordcloud.disk_hits")
+        _remember(key, png)
+        return png
+    return None
+
+
+# Function to lay out and render a word cloud to PNG bytes (no matplotlib figure involved)
+def render_png(frequencies: dict, width: int = 800, height: int = 400) -> bytes:
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=width, height=height, background_color='white').generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Function to fetch a rendered word cloud, computing the frequencies and layout only on a miss
+def wordcloud_png(source: str, entity_type: str, top_n: int, frequencies, width: int = 800, height: int = 400,
+                  variant: str = "", min_count: int = 1) -> bytes:
+    key = cache_key(source, entity_type, top_n, width, height, variant, min_count)
+    png = _lookup(key)
+    if png is not None:
+        return png
+
+    with _lock:
+        _stats["misses"] += 1
+    count("wordcloud.misses")
+    with span("wordcloud frequencies"):
+        frequencies = frequencies() if callable(frequencies) else frequencies
+    with span("wordcloud layout"):
+        png = render_png(frequencies, width, height)
+
+    # Write through to disk so other sessions and restarts share the render
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_bytes(os.path.join(CACHE_DIR, key + ".png"), png)
+
+    _remember(key, png)
+    return png
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return dict(_stats, memory_entries=len(_memory), memory_bytes=_memory_bytes)